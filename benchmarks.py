@@ -0,0 +1,373 @@
+import asyncio
+import time
+from nltk.corpus import opinion_lexicon
+from nltk.tokenize import word_tokenize
+from sentiment_analyzer import TextAnalyzer, analyzer
+from pipeline import Pipeline
+from fetcher import ArticleFetcher
+from instrumentation import StageTimings, method_stages
+from tests.support import load_corpus, local_rules, metric_drift, serve_articles
+
+
+def time_per_article(func, items, repeat=3):
+
+    """Returns the best per-item latency (in milliseconds) of func over the items"""
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1000
+
+
+def report(name, before, after):
+    print(f"{name}: before {before:.3f} ms/article, after {after:.3f} ms/article ({before / after:.1f}x)")
+
+
+def bench_lexicon(texts):
+
+    """Sentiment scoring with the lexicon rebuilt per call vs loaded once"""
+
+    analyzer = TextAnalyzer()
+    tokens = [word_tokenize(analyzer.clean_text(text)) for text in texts]
+
+    def rebuild_every_call(words):
+        positive_words = set(opinion_lexicon.words("positive-words.txt"))
+        negative_words = set(opinion_lexicon.words("negative-words.txt"))
+        positive_score = sum(1 for word in words if word in positive_words)
+        negative_score = sum(1 for word in words if word in negative_words)
+        return positive_score, negative_score
+
+    report('lexicon', time_per_article(rebuild_every_call, tokens), time_per_article(analyzer.sentiment_analysis, tokens))
+
+
+def bench_fused(texts):
+
+    """Per-metric analysis (cleaning and tokenizing repeatedly) vs the fused single pass"""
+
+    analyzer = TextAnalyzer()
+
+    def separate_passes(text):
+        cleaned_text = analyzer.clean_text(text)
+        tokenized_text = word_tokenize(cleaned_text)
+        analyzer.sentiment_analysis(tokenized_text)
+        analyzer.readability_analysis(cleaned_text)
+        analyzer.syllable_count_per_word(cleaned_text)
+        analyzer.count_personal_pronouns(cleaned_text)
+        analyzer.average_word_length(cleaned_text)
+
+    report('fused', time_per_article(separate_passes, texts), time_per_article(analyzer.analyze_text, texts))
+
+
+def bench_async(texts, delay=0.2):
+
+    """Wall-clock time of the serial fetch->analyze loop vs the async pipeline against a slow server"""
+
+    server, base_url = serve_articles(texts, delay)
+    rows = [(n, f'{base_url}/{n}') for n in range(len(texts))]
+    analyzer = TextAnalyzer(rules=local_rules())  # The local server is not a known site.
+
+    start = time.perf_counter()
+    with ArticleFetcher(max_workers=1, per_host=1) as fetcher:
+        for url_id, url in rows:
+            article_title, article_text = analyzer.parse_article_html(fetcher.fetch(url), url)
+            analyzer.analyze_text(article_text)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    asyncio.run(Pipeline(analyzer, cache_dir=None, result_cache_path=None).records_async(rows))
+    pipelined = time.perf_counter() - start
+
+    server.shutdown()
+    print(f"async: serial {serial:.2f} s, pipelined {pipelined:.2f} s ({serial / pipelined:.1f}x)")
+
+
+def bench_workers(texts, batch_size=2000):
+
+    """Throughput of analyze_many for 1..cpu_count worker processes"""
+
+    import os
+    batch = (texts * (batch_size // len(texts) + 1))[:batch_size]
+    baseline = None
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        analyzer.analyze_many(batch, workers=workers)
+        rate = len(batch) / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"workers={workers}: {rate:.0f} articles/s ({rate / baseline:.2f}x)")
+
+
+def bench_import(texts, repeat=5):
+
+    """Startup cost of importing sentiment_analyzer in a fresh interpreter"""
+
+    import subprocess
+    import sys
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import sentiment_analyzer'], check=True)
+        best = min(best, time.perf_counter() - start)
+    print(f"import: {best * 1000:.0f} ms")
+
+
+def bench_stopwords(texts):
+
+    """clean_text with the stopword set rebuilt per call vs loaded once"""
+
+    from nltk.corpus import stopwords
+    analyzer = TextAnalyzer()
+
+    def rebuild_every_call(text):
+        words = [word.lower() for word in word_tokenize(text) if word.isalnum()]
+        stop_words = set(stopwords.words('english'))
+        return ' '.join(word for word in words if word not in stop_words)
+
+    sizes = sorted(len(text.split()) for text in texts)
+    print(f"article sizes: median {sizes[len(sizes) // 2]} words, max {sizes[-1]} words")
+    report('stopwords', time_per_article(rebuild_every_call, texts), time_per_article(analyzer.clean_text, texts))
+
+
+def bench_syllables(texts):
+
+    """Syllable counting with the character loop for every occurrence vs the memo and precomputed table"""
+
+    cleaner = TextAnalyzer()
+    articles = [cleaner.clean_text(text).split() for text in texts]
+
+    def count_all(count):
+        return lambda words: sum(count(word) for word in words)
+
+    memoized = TextAnalyzer()
+    preloaded = TextAnalyzer()
+    preloaded.build_syllable_table(word for words in articles for word in words)
+    loop = time_per_article(count_all(TextAnalyzer._syllables_in_word), articles)
+    report('syllables (memo)', loop, time_per_article(count_all(memoized.count_syllables), articles))
+    report('syllables (table)', loop, time_per_article(count_all(preloaded.count_syllables), articles))
+    print(memoized.syllable_cache_info())
+
+
+def load_html_fixtures(texts, cache_dir='.http_cache'):
+
+    """Returns saved article pages from the HTTP cache, or pages built from the corpus if it is empty"""
+
+    import glob
+    import gzip
+    pages = []
+    for path in glob.glob(f'{cache_dir}/*.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            pages.append(f.read())
+    return pages or [f'<h1 class="entry-title">Article {n}</h1><div class="td-post-content tagdiv-type">{text}</div>'
+                     for n, text in enumerate(texts)]
+
+
+def bench_parsers(texts):
+
+    """Parse throughput of each installed backend, checking they extract identical title/text"""
+
+    from extraction import available_parsers, extract_article
+    pages = load_html_fixtures(texts)
+    expected = [extract_article(page, 'html.parser') for page in pages]
+    for parser in available_parsers():
+        start = time.perf_counter()
+        extracted = [extract_article(page, parser) for page in pages]
+        elapsed = time.perf_counter() - start
+        print(f"{parser}: {len(pages) / elapsed:.1f} pages/s, identical: {extracted == expected}")
+
+
+def bench_partial(texts):
+
+    """Parse time and peak memory per page of the full-tree parse vs the partial article-only parse"""
+
+    import tracemalloc
+    from extraction import extract_article
+    pages = load_html_fixtures(texts)
+
+    def peak_memory(partial):
+        peaks = []
+        for page in pages:
+            tracemalloc.start()
+            extract_article(page, partial=partial)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        return sum(peaks) / len(peaks) / 1024
+
+    full = time_per_article(lambda page: extract_article(page, partial=False), pages)
+    partial = time_per_article(lambda page: extract_article(page, partial=True), pages)
+    report('partial parse', full, partial)
+    print(f"peak memory: full {peak_memory(False):.0f} KiB/page, partial {peak_memory(True):.0f} KiB/page")
+    identical = all(extract_article(page, partial=False) == extract_article(page, partial=True) for page in pages)
+    print(f"identical extraction: {identical}")
+
+
+def bench_batch(texts, batch_size=2000):
+
+    """Articles per second of analyze_text one by one vs vectorized analyze_batch, checking they agree.
+
+    Each path gets its own fresh analyzer, so neither reuses the vocabulary the other interned and measured;
+    the first pass over the batch is cold, the second warm.
+    """
+
+    batch = (texts * (batch_size // len(texts) + 1))[:batch_size]
+    for tokenizer in ('regex', 'nltk'):
+        rates = {}
+        results = {}
+        for name, analyze in (('analyze_text', lambda analyzer: [analyzer.analyze_text(text) for text in batch]),
+                              ('analyze_batch', lambda analyzer: analyzer.analyze_batch(batch))):
+            analyzer = TextAnalyzer(tokenizer=tokenizer)
+            analyzer.lexicon, analyzer.stop_words
+            for run in ('cold', 'warm'):
+                start = time.perf_counter()
+                results[name] = analyze(analyzer)
+                rates[name, run] = len(batch) / (time.perf_counter() - start)
+        for run in ('cold', 'warm'):
+            serial, vectorized = rates['analyze_text', run], rates['analyze_batch', run]
+            print(f"batch ({tokenizer}, {run}): analyze_text {serial:.0f} articles/s, analyze_batch "
+                  f"{vectorized:.0f} articles/s ({vectorized / serial:.2f}x)")
+        print(f"batch ({tokenizer}): identical: {results['analyze_batch'] == results['analyze_text']}")
+
+
+def walk_counts(analyzer, tokens):
+
+    """The token counts of Vocabulary.counts as one Python walk over str tokens, the scoring before token ids"""
+
+    positive_words = analyzer.lexicon.positive
+    negative_words = analyzer.lexicon.negative
+    pronouns = analyzer.personal_pronouns
+
+    positive_score = negative_score = personal_pronouns = 0
+    word_count = total_syllables = total_characters = complex_word_count = 0
+    for token in tokens:  # Cleaned tokens: lowercase, alphanumeric and no stopwords.
+        if token in positive_words:
+            positive_score += 1
+        if token in negative_words:
+            negative_score += 1
+        if token in pronouns:
+            personal_pronouns += 1
+        syllables = analyzer.count_syllables(token)
+        word_count += 1
+        total_syllables += syllables
+        total_characters += len(token)
+        if len(token) > 6 and syllables > 3:
+            complex_word_count += 1
+
+    return {
+        'positive_score': positive_score,
+        'negative_score': negative_score,
+        'personal_pronouns': personal_pronouns,
+        'word_count': word_count,
+        'total_syllables': total_syllables,
+        'total_characters': total_characters,
+        'complex_word_count': complex_word_count
+    }
+
+
+def bench_vocabulary(texts):
+
+    """Token scoring as a Python walk over str tokens vs gathers over interned int32 token ids"""
+
+    analyzer = TextAnalyzer()
+    tokens = [analyzer.analyze_document(text).tokens for text in texts]  # Also interns the corpus vocabulary.
+    vocabulary = analyzer.vocabulary
+
+    report('vocabulary', time_per_article(lambda words: walk_counts(analyzer, words), tokens),
+           time_per_article(lambda words: vocabulary.counts(vocabulary.encode(words)), tokens))
+    identical = all(walk_counts(analyzer, words) == vocabulary.counts(vocabulary.encode(words)) for words in tokens)
+    print(f"vocabulary: {len(vocabulary)} distinct tokens, identical: {identical}")
+
+
+def bench_tokenizers(texts):
+
+    """Tokenization throughput of the regex backend vs NLTK, and how far its metrics drift on the corpus"""
+
+    nltk_analyzer = TextAnalyzer(tokenizer='nltk')
+    regex_analyzer = TextAnalyzer(tokenizer='regex')
+    report('tokenizers', time_per_article(nltk_analyzer.clean_text, texts),
+           time_per_article(regex_analyzer.clean_text, texts))
+
+    for name, (mean, worst) in metric_drift(nltk_analyzer, regex_analyzer, texts).items():
+        print(f"  {name}: mean drift {mean:.2%}, max {worst:.2%}")
+
+
+def bench_lazy(texts):
+
+    """Reading two metrics off a lazy AnalyzedDocument vs building the full analyze_text dict"""
+
+    analyzer = TextAnalyzer()
+    documents = [analyzer.analyze_document(text) for text in texts]  # Tokenization is shared, so time it once.
+
+    def full(document):
+        document._counts.clear()
+        return document.to_dict()
+
+    def two_metrics(document):
+        document._counts.clear()
+        return document.polarity_score, document.average_sentence_length
+
+    report('lazy', time_per_article(full, documents), time_per_article(two_metrics, documents))
+
+
+def bench_metrics(texts, repeat=3):
+
+    """Sentiment-only analyze_text (no syllable counting, no segmentation with regex) vs all 13 metrics"""
+
+    def cold_run(tokenizer, metrics):
+        best = float('inf')
+        for _ in range(repeat):
+            analyzer = TextAnalyzer(tokenizer=tokenizer)  # Empty vocabulary, so new words get measured as in a run.
+            analyzer.lexicon, analyzer.stop_words
+            start = time.perf_counter()
+            for text in texts:
+                analyzer.analyze_text(text, metrics)
+            best = min(best, time.perf_counter() - start)
+        return best / len(texts) * 1000
+
+    for tokenizer in ('nltk', 'regex'):
+        report(f'metrics ({tokenizer})', cold_run(tokenizer, None),
+               cold_run(tokenizer, ['POLARITY SCORE', 'SUBJECTIVITY SCORE']))
+
+
+def bench_timings(texts):
+
+    """Overhead of the stage timings on analyze_text: uninstrumented vs every TextAnalyzer method timed"""
+
+    analyzer = TextAnalyzer()
+    before = time_per_article(analyzer.analyze_text, texts)
+    timings = StageTimings()
+    with timings.instrumented(analyzer, method_stages(TextAnalyzer)):
+        after = time_per_article(analyzer.analyze_text, texts)
+    print(f"timings: {before:.3f} ms/article untimed, {after:.3f} ms/article timed "
+          f"({(after / before - 1) * 100:+.1f}%)")
+    print(timings.summary())
+
+
+BENCHMARKS = {
+    'lexicon': bench_lexicon,
+    'fused': bench_fused,
+    'async': bench_async,
+    'workers': bench_workers,
+    'import': bench_import,
+    'stopwords': bench_stopwords,
+    'syllables': bench_syllables,
+    'parsers': bench_parsers,
+    'partial': bench_partial,
+    'batch': bench_batch,
+    'vocabulary': bench_vocabulary,
+    'tokenizers': bench_tokenizers,
+    'lazy': bench_lazy,
+    'metrics': bench_metrics,
+    'timings': bench_timings,
+}
+
+
+def main():
+    import sys
+    texts = load_corpus()
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name](texts)
+
+
+if __name__ == "__main__":
+    main()
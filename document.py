@@ -0,0 +1,198 @@
+from collections import namedtuple
+from functools import lru_cache
+
+# Output column -> (AnalyzedDocument property, token counts it reads, whether it needs sentence boundaries),
+# in analyze_text output order.
+METRICS = {
+    'POSITIVE SCORE': ('positive_score', ('positive_score',), False),
+    'NEGATIVE SCORE': ('negative_score', ('negative_score',), False),
+    'POLARITY SCORE': ('polarity_score', ('positive_score', 'negative_score'), False),
+    'SUBJECTIVITY SCORE': ('subjectivity_score', ('positive_score', 'negative_score'), False),
+    'AVG SENTENCE LENGTH': ('average_sentence_length', (), True),
+    'PERCENTAGE OF COMPLEX WORDS': ('percentage_of_complex_words', ('complex_word_count',), False),
+    'FOG INDEX': ('fog_index', ('complex_word_count', 'word_count'), True),
+    'AVG NUMBER OF WORDS PER SENTENCE': ('average_sentence_length', (), True),
+    'COMPLEX WORD COUNT': ('complex_word_count', ('complex_word_count',), False),
+    'WORD COUNT': ('token_count', (), False),
+    'SYLLABLE PER WORD': ('syllables_per_word', ('total_syllables', 'word_count'), False),
+    'PERSONAL PRONOUNS': ('personal_pronouns', ('personal_pronouns',), False),
+    'AVG WORD LENGTH': ('average_word_length', ('total_characters', 'word_count'), False),
+}
+
+class MetricPlan(namedtuple('MetricPlan', ['metrics', 'counts', 'sentences'])):
+
+    """The stages a set of requested metrics needs: which token counts and whether sentence boundaries.
+
+    Syllables are only counted when a count reading them (total_syllables, complex_word_count) is gathered.
+    """
+
+    __slots__ = ()
+
+    @property
+    def complete(self):
+        return len(self.metrics) == len(METRICS)
+
+
+def metric_name(name):
+
+    """Returns the output column of a metric name, accepting e.g. 'polarity-score' or 'polarity_score'"""
+
+    column = ' '.join(name.replace('_', ' ').replace('-', ' ').upper().split())
+    if column not in METRICS:
+        raise ValueError(f"Unknown metric {name}, expected one of {', '.join(METRICS)}")
+    return column
+
+
+def plan_metrics(metrics=None):
+
+    """Returns the MetricPlan of the requested metric names (all of them when None)"""
+
+    if metrics is None:
+        return _plan(tuple(METRICS))
+    return _plan(frozenset(metric_name(name) for name in metrics))
+
+
+@lru_cache(maxsize=None)
+def _plan(columns):
+    metrics = tuple(column for column in METRICS if column in columns)  # Kept in output order.
+    if not metrics:
+        raise ValueError("At least one metric must be requested")
+    counts = frozenset(count for column in metrics for count in METRICS[column][1])
+    sentences = any(METRICS[column][2] for column in metrics)
+    return MetricPlan(metrics, counts, sentences)
+
+
+class AnalyzedDocument:
+
+    """An article tokenized once: its token id array, the sentence boundaries over it and lazily computed metrics.
+
+    Sentences are segmented on the raw text and each one is tokenized once, so every readability metric
+    reads the same boundaries and per-sentence token counts instead of re-tokenizing (sentence_offsets is
+    None when the requested metrics did not need segmentation, or when batch scoring only kept the sentence
+    count). Each token count is a gather over the token ids, computed on first access and cached, so callers
+    reading two metrics only pay for the counts those two need; to_dict() computes every requested count
+    together, at the fused single-pass cost.
+    """
+
+    __slots__ = ('token_ids', 'sentence_offsets', 'vocabulary', '_counts', '_sentence_count')
+
+    def __init__(self, token_ids, sentence_offsets, vocabulary, counts=None, sentence_count=None):
+        self.token_ids = token_ids  # int32 ids of the cleaned tokens (lowercase, alphanumeric, no stopwords).
+        self.sentence_offsets = sentence_offsets  # Start of each sentence in token_ids, followed by the end, or None.
+        self.vocabulary = vocabulary  # The Vocabulary the ids belong to.
+        self._counts = dict(counts or {})
+        self._sentence_count = sentence_count  # Number of sentences when the offsets were not kept.
+
+    def preload(self, counts):
+
+        """Stores token counts computed elsewhere (e.g. by batch scoring)"""
+
+        self._counts.update(counts)
+
+    def _count(self, name):
+        if name not in self._counts:
+            self._counts.update(self.vocabulary.counts(self.token_ids, [name]))
+        return self._counts[name]
+
+    @property
+    def tokens(self):
+
+        """Returns the cleaned tokens as strings"""
+
+        words = self.vocabulary.words
+        return [words[token_id] for token_id in self.token_ids]
+
+    # Sentence structure.
+
+    @property
+    def token_count(self):
+        return len(self.token_ids)
+
+    @property
+    def sentence_count(self):
+        if self.sentence_offsets is None:
+            if self._sentence_count is not None:
+                return self._sentence_count
+            raise ValueError("The document was analyzed without sentence segmentation")
+        return len(self.sentence_offsets) - 1
+
+    @property
+    def sentence_lengths(self):
+
+        """Returns the number of tokens of each sentence"""
+
+        offsets = self.sentence_offsets
+        if offsets is None:
+            raise ValueError("The document was analyzed without sentence segmentation")
+        return [end - start for start, end in zip(offsets, offsets[1:])]
+
+    @property
+    def average_sentence_length(self):
+        return self.token_count / self.sentence_count
+
+    # Token counts, each one gather over the token ids.
+
+    @property
+    def positive_score(self):
+        return self._count('positive_score')
+
+    @property
+    def negative_score(self):
+        return self._count('negative_score')
+
+    @property
+    def personal_pronouns(self):
+        return self._count('personal_pronouns')
+
+    @property
+    def word_count(self):
+        return self._count('word_count')
+
+    @property
+    def total_syllables(self):
+        return self._count('total_syllables')
+
+    @property
+    def total_characters(self):
+        return self._count('total_characters')
+
+    @property
+    def complex_word_count(self):
+        return self._count('complex_word_count')
+
+    # Metrics derived from the counts.
+
+    @property
+    def polarity_score(self):
+        return (self.positive_score - self.negative_score) / (self.positive_score + self.negative_score + 0.000001)
+
+    @property
+    def subjectivity_score(self):
+        return (self.positive_score + self.negative_score) / (self.token_count + 0.000001)
+
+    @property
+    def percentage_of_complex_words(self):
+        return self.complex_word_count / self.token_count
+
+    @property
+    def fog_index(self):
+        return 0.4 * (self.average_sentence_length + (self.complex_word_count / self.word_count))
+
+    @property
+    def syllables_per_word(self):
+        return self.total_syllables / self.word_count
+
+    @property
+    def average_word_length(self):
+        return self.total_characters / self.word_count
+
+    def to_dict(self, metrics=None):
+
+        """Returns the requested metrics (all by default) as the analyze_text output dict"""
+
+        plan = plan_metrics(metrics)
+        missing = [name for name in self.vocabulary.COUNTS if name in plan.counts and name not in self._counts]
+        if missing:
+            self._counts.update(self.vocabulary.counts(self.token_ids, missing))  # The needed counts in one go.
+
+        return {column: getattr(self, METRICS[column][0]) for column in plan.metrics}
@@ -0,0 +1,143 @@
+import json
+import os
+import re
+from functools import lru_cache
+from importlib.util import find_spec
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# BeautifulSoup tree builders, fastest first. lxml is a C parser, html.parser ships with Python.
+PARSER_BACKENDS = ['lxml', 'html.parser']
+
+
+def available_parsers():
+
+    """Returns the installed parser backends, fastest first"""
+
+    return [parser for parser in PARSER_BACKENDS if parser == 'html.parser' or find_spec(parser) is not None]
+
+
+def default_parser():
+
+    """Returns the fastest installed parser backend"""
+
+    return available_parsers()[0]
+
+
+class ExtractionRule:
+
+    """Title and text selectors of one site template, each a fallback chain tried in order.
+
+    A selector is a dict with the tag "name" and the attributes to match, as in BeautifulSoup's find(). The
+    selectors are compiled once into SoupStrainers, which serve both to find the elements and to limit
+    partial parsing to the article subtrees.
+    """
+
+    def __init__(self, name, title, text, url_patterns=()):
+        self.name = name
+        self.url_patterns = [re.compile(pattern) for pattern in url_patterns]
+        self.title = [self._compile(selector) for selector in title]
+        self.text = [self._compile(selector) for selector in text]
+
+        # Only the title and text elements (with their subtrees) are built when parsing partially; headers,
+        # sidebars, comments and scripts are skipped by the tree builder instead of being parsed and thrown away.
+        self.strainer = self._union(title + text)
+
+    @staticmethod
+    def _compile(selector):
+        attrs = dict(selector)
+        return SoupStrainer(attrs.pop('name', None), attrs)
+
+    @staticmethod
+    def _union(selectors):
+
+        """Returns one SoupStrainer keeping every element any of the selectors can match (possibly a few more)"""
+
+        attr_names = {tuple(sorted(key for key in selector if key != 'name')) for selector in selectors}
+        if len(attr_names) != 1:
+            return None  # Selectors on different attributes cannot share a strainer, the full tree is parsed.
+        names = None  # Any tag name, unless every selector names its tag.
+        if all('name' in selector for selector in selectors):
+            names = sorted({selector['name'] for selector in selectors})
+        # During parsing multi-valued attributes such as class are still raw strings, so each value is matched as
+        # a whitespace separated run inside them, as find() does on the finished tree.
+        attrs = {key: re.compile('|'.join(r'(?:^|\s)' + re.escape(value) + r'(?:\s|$)'
+                                          for value in sorted({selector[key] for selector in selectors})))
+                 for key in attr_names.pop()}
+        return SoupStrainer(names, attrs)
+
+    def matches(self, url):
+        return any(pattern.search(url) for pattern in self.url_patterns)
+
+    @staticmethod
+    def _first_text(soup, chain):
+        for strainer in chain:
+            element = soup.find(strainer)
+            if element:
+                return element.get_text().strip()  # Extracting and stripping the text of the element.
+        return None
+
+    def extract(self, html, parser=None, partial=True):
+
+        """Extracts article title and text from the HTML of an article page"""
+
+        # Parsing the HTML content of the response, only the article subtrees unless partial is False.
+        soup = BeautifulSoup(html, parser or default_parser(), parse_only=self.strainer if partial else None)
+
+        article_title = self._first_text(soup, self.title)  # Extracting article title.
+        article_text = self._first_text(soup, self.text)  # Extracting article text
+
+        return article_title, article_text  # Returns the article title and text(TO BE USED DURING SENTIMENT ANALYSIS)
+
+
+class RuleRegistry:
+
+    """Extraction rules keyed by URL pattern, with an optional default rule for unmatched URLs.
+
+    Without a default, URLs of unknown sites match no rule and are skipped before being downloaded; a
+    default (opt-in, e.g. for a site list known to share one template) sends every URL to that rule.
+    """
+
+    def __init__(self, rules, default=None):
+        self.rules = list(rules)
+        self.default = next((rule for rule in self.rules if rule.name == default), None) if default else None
+
+    def match(self, url):
+
+        """Returns the rule for the URL, or None if its site cannot be extracted (checked before fetching)"""
+
+        if url is not None:
+            for rule in self.rules:
+                if rule.matches(url):
+                    return rule
+        return self.default
+
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extraction_rules.json')
+
+
+def load_rules(path=DEFAULT_RULES_FILE):
+
+    """Loads a RuleRegistry from a JSON config file"""
+
+    with open(path) as f:
+        config = json.load(f)
+    rules = [ExtractionRule(rule['name'], rule['title'], rule['text'], rule.get('url_patterns', ()))
+             for rule in config['rules']]
+    return RuleRegistry(rules, config.get('default'))
+
+
+@lru_cache(maxsize=None)
+def default_rules():
+
+    """Returns the RuleRegistry of the bundled extraction_rules.json, loaded once per process"""
+
+    return load_rules()
+
+
+def extract_article(html, parser=None, partial=True, rule=None):
+
+    """Extracts article title and text from the HTML of an article page, with the first bundled rule by default"""
+
+    rule = rule or default_rules().default or default_rules().rules[0]
+    return rule.extract(html, parser, partial)
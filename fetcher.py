@@ -0,0 +1,257 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpCache:
+
+    """On-disk HTTP response cache revalidated with conditional GETs.
+
+    Each URL is stored as a gzip-compressed body plus a small JSON file holding its ETag and Last-Modified
+    validators. Entries older than ttl seconds are dropped, and the least recently used entries are evicted
+    once the compressed bodies exceed max_bytes, down to 90% of it so the sort runs rarely. Files are replaced
+    atomically, so a run killed mid-write leaves the previous entry (or none) rather than a truncated one.
+    Bodies are compressed, read and written outside the lock; it only guards the index and the counters.
+    """
+
+    META_FIELDS = {'key', 'url', 'size', 'stored_at', 'used_at'}
+
+    def __init__(self, directory='.http_cache', ttl=30 * 24 * 3600, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.revalidated = 0  # Requests answered with 304 Not Modified.
+        self.downloaded = 0  # Requests that transferred a full body.
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # In-memory index of key -> metadata, so eviction does not have to scan the directory.
+        self._index = {}
+        self._total_bytes = 0  # Compressed size of the indexed bodies, kept up to date by store and _remove.
+        names = os.listdir(directory)
+        for name in names:
+            if name.endswith('.tmp'):
+                os.remove(os.path.join(directory, name))  # Left over by a run that died mid-write.
+            elif name.endswith('.json'):
+                key = name[:-len('.json')]
+                try:
+                    with open(os.path.join(directory, name)) as f:
+                        meta = json.load(f)
+                    if not isinstance(meta, dict) or not self.META_FIELDS <= meta.keys():
+                        raise ValueError(f"Incomplete cache entry {name}")
+                    self._index[key] = meta
+                except (OSError, ValueError):
+                    self._remove(key)  # Unreadable entry: dropped, the page is downloaded again.
+        for name in names:
+            if name.endswith('.gz') and name[:-len('.gz')] not in self._index:
+                self._remove(name[:-len('.gz')])  # Body whose metadata was never written.
+        self._total_bytes = sum(meta['size'] for meta in self._index.values())
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def _write(self, path, data):
+
+        """Writes a file atomically: to a temporary file first, then renamed over the target"""
+
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def _write_meta(self, meta):
+        self._write(self._path(meta['key'], '.json'), json.dumps(meta).encode('utf-8'))
+
+    def _remove_from_index(self, key):
+        meta = self._index.pop(key, None)
+        if meta is not None:
+            self._total_bytes -= meta['size']
+
+    def _remove(self, key):
+        self._remove_from_index(key)
+        for suffix in ('.json', '.gz'):
+            try:
+                os.remove(self._path(key, suffix))
+            except FileNotFoundError:
+                pass
+
+    def lookup(self, url):
+
+        """Returns the stored metadata of the URL, or None if it is missing or expired"""
+
+        key = hashlib.sha256(url.encode()).hexdigest()
+        with self._lock:
+            meta = self._index.get(key)
+            if meta is not None and time.time() - meta['stored_at'] > self.ttl:
+                self._remove(key)  # TTL based eviction.
+                meta = None
+            return meta
+
+    def conditional_headers(self, meta):
+
+        """Returns the If-None-Match / If-Modified-Since headers for revalidating an entry"""
+
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def load(self, meta):
+
+        """Returns the cached body of an entry that the server reported as not modified.
+
+        Returns None if the body is gone (e.g. evicted since the lookup), so the caller fetches it in full.
+        """
+
+        try:
+            with gzip.open(self._path(meta['key'], '.gz'), 'rt', encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, EOFError):
+            with self._lock:
+                self._remove(meta['key'])
+            return None
+        with self._lock:
+            self.revalidated += 1
+            meta['used_at'] = time.time()
+            indexed = meta['key'] in self._index
+        if indexed:
+            self._write_meta(meta)  # Persisted, so eviction stays least recently used across runs.
+        return body
+
+    def store(self, url, response):
+
+        """Stores a full response if it carries a validator, evicting old entries to stay under max_bytes"""
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self._lock:
+            self.downloaded += 1
+        if not response.ok or not (etag or last_modified):
+            return  # Nothing to revalidate against later.
+
+        key = hashlib.sha256(url.encode()).hexdigest()
+        body = gzip.compress(response.text.encode('utf-8'))
+        self._write(self._path(key, '.gz'), body)
+        meta = {'key': key, 'url': url, 'etag': etag, 'last_modified': last_modified,
+                'size': len(body), 'stored_at': time.time(), 'used_at': time.time()}
+        self._write_meta(meta)  # Written last: an entry only exists once its body is complete.
+
+        with self._lock:
+            self._remove_from_index(key)
+            self._index[key] = meta
+            self._total_bytes += meta['size']
+            if self._total_bytes > self.max_bytes:
+                self._evict(self.max_bytes * 0.9)
+
+    def _evict(self, target_bytes):
+
+        """Removes the least recently used entries until the bodies fit in target_bytes"""
+
+        for entry in sorted(self._index.values(), key=lambda entry: entry['used_at']):
+            if self._total_bytes <= target_bytes:
+                break
+            self._remove(entry['key'])  # Size based eviction, least recently used first.
+
+    def report(self):
+
+        """Returns a one line summary of the cache hit rate"""
+
+        total = self.revalidated + self.downloaded
+        hit_rate = self.revalidated / total * 100 if total else 0
+        return (f"HTTP cache: {self.revalidated} not modified (304), {self.downloaded} downloaded, "
+                f"hit rate {hit_rate:.1f}%")
+
+
+class ArticleFetcher:
+
+    """Fetches article pages over a pooled HTTP session with bounded concurrency"""
+
+    def __init__(self, max_workers=8, per_host=4, timeout=30, cache=None):
+        self.cache = cache  # Optional HttpCache, revalidated with conditional GETs.
+        self.max_workers = max_workers  # Number of requests in flight at once.
+        self.per_host = per_host  # Cap on requests in flight against a single host.
+        self.timeout = timeout
+
+        # One session shares its keep-alive connections between all requests, so each host pays the
+        # TCP+TLS handshake once instead of once per URL.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+
+    def _host_slot(self, url):
+
+        """Returns the semaphore limiting concurrent requests to the URL's host"""
+
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def fetch(self, url):
+
+        """Returns the body of the page at the URL, or None if it could not be fetched"""
+
+        try:
+            meta = self.cache.lookup(url) if self.cache else None
+            headers = self.cache.conditional_headers(meta) if meta else None
+            with self._host_slot(url):
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+
+            if self.cache is None:
+                return response.text
+            if response.status_code == 304 and meta:
+                body = self.cache.load(meta)  # Unchanged since the last run, the body comes from disk...
+                if body is not None:
+                    return body
+                with self._host_slot(url):  # ...unless it was evicted meanwhile, then it is fetched in full.
+                    response = self.session.get(url, timeout=self.timeout)
+            self.cache.store(url, response)
+            return response.text
+
+        except Exception as e:
+            print(f"Error occurred while fetching {url}: {e}")
+            return None
+
+    def fetch_all(self, urls, prefetch=None):
+
+        """Fetches the URLs concurrently, yielding (url, html) pairs in input order.
+
+        The URLs are consumed lazily, at most prefetch (default 2 * max_workers) ahead of the caller.
+        """
+
+        prefetch = prefetch or 2 * self.max_workers
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for url in urls:
+                in_flight.append((url, executor.submit(self.fetch, url)))
+                if len(in_flight) >= prefetch:
+                    url, future = in_flight.popleft()
+                    yield url, future.result()
+            while in_flight:
+                url, future = in_flight.popleft()
+                yield url, future.result()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,200 @@
+import csv
+import glob
+import json
+import os
+import shutil
+
+import pandas as pd
+
+OUTPUT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+class IncrementalWriter:
+
+    """Appends the rows of one output schema in batches, checkpointing the completed URL_IDs.
+
+    Every batch_size records the rows are appended to an append-friendly file (CSV or JSONL) and synced to
+    disk; only then are their URL_IDs appended to the sidecar checkpoint file (<output>.done). A crash loses
+    at most one batch, and memory does not grow with the corpus. The Excel layout is produced at the end
+    only if asked for.
+
+    Parquet output is a directory of compressed part files, one row group per batch, with typed numeric
+    columns (pyarrow is needed for it).
+    """
+
+    def __init__(self, schema, output_format='csv', batch_size=100, excel=False, append=False, compression='zstd'):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format {output_format}, expected one of {', '.join(OUTPUT_FORMATS)}")
+        self.schema = schema
+        self.output_format = output_format
+        self.batch_size = batch_size
+        self.excel = excel
+        self.compression = compression  # Parquet codec.
+        self.path = f'{os.path.splitext(schema.path)[0]}.{output_format}'
+        self.checkpoint_path = self.path + '.done'
+        self.columns = [column for column, _ in schema.columns]
+        self._rows = []
+        self._url_ids = []
+        self._resumed_ids = set()  # URL_IDs already in this output when resuming.
+
+        if not append:  # A fresh run starts from empty files.
+            if os.path.isdir(self.path):
+                shutil.rmtree(self.path)
+            for path in (self.path, self.checkpoint_path):
+                if os.path.isfile(path):
+                    os.remove(path)
+        else:
+            self._truncate_to_checkpoint()
+            self._resumed_ids = self.completed_ids()
+
+    def completed_ids(self):
+
+        """Returns the set of checkpointed URL_IDs (as strings), for fast membership tests when resuming"""
+
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            return {line.rstrip('\n') for line in f if line.strip()}
+
+    def _truncate_to_checkpoint(self):
+
+        """Drops rows a crash left behind after the data was written but before it was checkpointed"""
+
+        if not os.path.exists(self.path):
+            return
+        with open(self.checkpoint_path if os.path.exists(self.checkpoint_path) else os.devnull, encoding='utf-8') as f:
+            checkpointed = sum(1 for line in f if line.strip())
+
+        if self.output_format == 'parquet':
+            import pyarrow.parquet as pq
+            written = 0
+            for part in self._parquet_parts():
+                rows = pq.ParquetFile(part).metadata.num_rows
+                if written + rows > checkpointed:
+                    os.remove(part)  # Written, but the crash came before its checkpoint.
+                else:
+                    written += rows
+            return
+
+        with open(self.path, newline='', encoding='utf-8') as f:
+            if self.output_format == 'csv':
+                rows = list(csv.reader(f))
+                header, rows = rows[:1], rows[1:]
+            else:
+                header, rows = [], [line for line in f if line.strip()]
+        if len(rows) <= checkpointed:
+            return
+
+        with open(self.path, 'w', newline='', encoding='utf-8') as f:
+            if self.output_format == 'csv':
+                csv.writer(f).writerows(header + rows[:checkpointed])
+            else:
+                f.writelines(rows[:checkpointed])
+
+    def _parquet_parts(self):
+        return sorted(glob.glob(os.path.join(self.path, 'part-*.parquet')))
+
+    def _write_parquet_part(self):
+
+        """Writes the buffered rows as a new compressed Parquet part file, atomically"""
+
+        import pyarrow as pa  # Only needed for Parquet output.
+        import pyarrow.parquet as pq
+
+        columns = {}
+        for column in self.columns:
+            values = [row[column] for row in self._rows]
+            if column == 'URL_ID':
+                values = [str(value) for value in values]  # Keeps the key column one type across inputs.
+            columns[column] = values
+        table = pa.table(columns)  # Metric columns become int64 / float64 columns.
+
+        os.makedirs(self.path, exist_ok=True)
+        parts = self._parquet_parts()
+        number = int(os.path.basename(parts[-1])[len('part-'):-len('.parquet')]) + 1 if parts else 0
+        part = os.path.join(self.path, f'part-{number:06d}.parquet')
+        pq.write_table(table, part + '.tmp', compression=self.compression)
+        os.replace(part + '.tmp', part)
+
+    def add(self, record):
+
+        """Buffers the output row of a record, flushing once a batch is full.
+
+        When resuming, records this output already holds are skipped: a crash between the flushes of two
+        outputs leaves the URL_IDs of that batch in one of them only, and the rerun must not duplicate them.
+        """
+
+        if str(record['URL_ID']) in self._resumed_ids:
+            return
+        self._rows.append(self.schema.row(record))
+        self._url_ids.append(record['URL_ID'])
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+
+        """Appends the buffered rows to the output file, then checkpoints their URL_IDs"""
+
+        if not self._rows:
+            return
+
+        if self.output_format == 'parquet':
+            self._write_parquet_part()
+        else:
+            self._append_rows()
+
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            f.writelines(f'{url_id}\n' for url_id in self._url_ids)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._rows = []
+        self._url_ids = []
+
+    def _append_rows(self):
+
+        """Appends the buffered rows to the CSV or JSONL output file"""
+
+        write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            if self.output_format == 'csv':
+                writer = csv.DictWriter(f, fieldnames=self.columns)
+                if write_header:
+                    writer.writeheader()
+                writer.writerows(self._rows)
+            else:
+                f.writelines(json.dumps(row, default=str) + '\n' for row in self._rows)
+            f.flush()
+            os.fsync(f.fileno())  # The rows are on disk before they are marked as completed.
+
+    def read(self):
+
+        """Loads everything written so far into a DataFrame"""
+
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=self.columns)
+        if self.output_format == 'parquet':
+            parts = self._parquet_parts()
+            if not parts:
+                return pd.DataFrame(columns=self.columns)
+            return pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+        if self.output_format == 'csv':
+            return pd.read_csv(self.path)
+        return pd.read_json(self.path, lines=True)
+
+    def to_excel(self):
+
+        """Writes the whole output in the schema's Excel layout"""
+
+        self.read().to_excel(self.schema.path, index=False)
+
+    def close(self):
+
+        """Flushes the last batch and converts the output to the Excel layout if asked"""
+
+        self.flush()
+        if self.excel:
+            self.to_excel()
+            print(f"Extraction completed. Output saved to {self.schema.path}")
+        else:
+            print(f"Extraction completed. Output saved to {self.path}")
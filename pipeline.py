@@ -0,0 +1,406 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
+
+from document import METRICS, plan_metrics
+from fetcher import ArticleFetcher, HttpCache
+from instrumentation import StageTimings, method_stages
+from output_writers import IncrementalWriter
+from result_cache import AnalysisCache
+
+# Metric columns of TextAnalyzer.analyze_text, in output order.
+METRIC_COLUMNS = list(METRICS)
+
+
+class OutputSchema:
+
+    """Column layout of one output file, as (output column, record field) pairs"""
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+
+    def row(self, record):
+
+        """Returns the output row of a pipeline record"""
+
+        return {column: record[field] for column, field in self.columns}
+
+    def without(self, field):
+
+        """Returns a copy of the schema without the columns of a record field"""
+
+        return OutputSchema(self.path, [(column, source) for column, source in self.columns if source != field])
+
+    def with_metrics(self, metrics):
+
+        """Returns a copy of the schema keeping only the requested metric columns"""
+
+        return OutputSchema(self.path, [(column, source) for column, source in self.columns
+                                        if source not in METRICS or source in metrics])
+
+    def has(self, field):
+        return any(source == field for _, source in self.columns)
+
+
+# Output.xlsx of sentiment_analyzer.main.
+ANALYSIS_SCHEMA = OutputSchema('Output.xlsx', [(column, column) for column in METRIC_COLUMNS]
+                               + [('URL_ID', 'URL_ID'), ('URL', 'URL')])
+
+# extracted_articles.xlsx of main.ArticleScraper.
+ARTICLES_SCHEMA = OutputSchema('extracted_articles.xlsx', [
+    ('URL', 'URL'),
+    ('Article_Title', 'Article_Title'),
+    ('Article_Text', 'Article_Text'),
+    ('Positive_Score', 'POSITIVE SCORE'),
+    ('Negative_Score', 'NEGATIVE SCORE'),
+    ('Polarity_Score', 'POLARITY SCORE'),
+    ('Subjectivity_Score', 'SUBJECTIVITY SCORE'),
+    ('Avg_Words_Per_Sentence', 'AVG NUMBER OF WORDS PER SENTENCE'),
+    ('Complex_Word_Count', 'COMPLEX WORD COUNT'),
+    ('Fog_Index', 'FOG INDEX'),
+    ('Syllable_Per_Word', 'SYLLABLE PER WORD'),
+    ('Personal_Pronouns', 'PERSONAL PRONOUNS'),
+    ('Avg_Word_Length', 'AVG WORD LENGTH'),
+])
+
+# Full article texts keyed by URL_ID, written apart from the metrics with text_column='separate'.
+TEXT_SCHEMA = OutputSchema('Article_Text.xlsx', [('URL_ID', 'URL_ID'), ('Article_Text', 'Article_Text')])
+
+SCHEMAS = {'analysis': ANALYSIS_SCHEMA, 'articles': ARTICLES_SCHEMA}
+
+# Timed stages of an instrumented run, as {method name: stage name} per component. Every other public
+# TextAnalyzer method is timed as 'TextAnalyzer.<method>'.
+ANALYZER_STAGES = {
+    'parse_article_html': 'parse',
+    'analyze_text': 'analysis',
+    'analyze_document': 'tokenization',
+    'count_syllables': 'syllables',
+}
+PIPELINE_STAGES = {'process_page': 'page'}
+FETCHER_STAGES = {'fetch': 'fetch'}
+WRITER_STAGES = {'add': 'write', 'flush': 'flush', 'to_excel': 'excel'}
+TEXT_COLUMN_MODES = ('inline', 'separate', 'none')
+
+
+class Pipeline:
+
+    """The fetch -> parse -> analyze -> write engine shared by every entry point.
+
+    Each article is fetched and analyzed once into a record (URL_ID, URL, Article_Title, Article_Text and
+    the analyze_text metrics), which is then written out in every requested output schema. With metrics,
+    only those metric columns are computed and written. With analysis_workers, the analysis runs over that
+    many worker processes (TextAnalyzer.analyze_many) instead of on the calling thread. With timings_path,
+    every stage is timed and the end-of-run report prints a summary and writes the JSON timings report there.
+    """
+
+    def __init__(self, analyzer, schemas=(ANALYSIS_SCHEMA,), max_workers=8, per_host=4, cache_dir='.http_cache',
+                 result_cache_path='.analysis_cache.sqlite', output_format='csv', batch_size=100, excel=False,
+                 text_column='inline', metrics=None, timings_path=None, analysis_workers=None):
+        self.analyzer = analyzer
+        self.metrics = None if metrics is None else plan_metrics(metrics).metrics
+        self.schemas = list(schemas)
+        if self.metrics is not None:
+            self.schemas = [schema.with_metrics(self.metrics) for schema in self.schemas]
+        if text_column != 'inline' and any(schema.has('Article_Text') for schema in self.schemas):
+            # Metric-only outputs stay small, so analytics can load them without the full texts.
+            self.schemas = [schema.without('Article_Text') for schema in self.schemas]
+            if text_column == 'separate':
+                # The texts are joined back on URL_ID, so every output carries it.
+                self.schemas = [schema if schema.has('URL_ID') else OutputSchema(schema.path, [('URL_ID', 'URL_ID')]
+                                                                                 + schema.columns)
+                                for schema in self.schemas]
+                self.schemas.append(TEXT_SCHEMA)
+        self.output_format = output_format  # Append-friendly format the records are streamed to.
+        self.batch_size = batch_size
+        self.excel = excel  # Also convert each output to its Excel layout at the end of the run.
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.analysis_workers = analysis_workers  # Worker processes of the CPU stage, None analyzes in-process.
+        self.cache = HttpCache(cache_dir) if cache_dir else None
+        self.result_cache_path = result_cache_path  # None runs without an analysis cache.
+        self.result_cache = None  # The AnalysisCache of the current (or last) run.
+        self.timings_path = timings_path
+        self.timings = StageTimings() if timings_path else None  # None keeps every stage unwrapped.
+
+    def open_fetcher(self):
+        fetcher = ArticleFetcher(max_workers=self.max_workers, per_host=self.per_host, cache=self.cache)
+        if self.timings:
+            self.timings.instrument(fetcher, FETCHER_STAGES)
+        return fetcher
+
+    @contextmanager
+    def analysis_cache(self):
+
+        """Attaches the run's AnalysisCache (or none) to the analyzer for the duration of the with block.
+
+        The analyzer is shared by the entry points, so its previous result_cache is put back afterwards and the
+        cache connection is closed.
+        """
+
+        previous = self.analyzer.result_cache
+        self.result_cache = AnalysisCache(self.result_cache_path) if self.result_cache_path else None
+        self.analyzer.result_cache = self.result_cache
+        try:
+            yield self.result_cache
+        finally:
+            self.analyzer.result_cache = previous
+            if self.result_cache:
+                self.result_cache.close()
+
+    def instrumented(self):
+
+        """Returns a context timing the analyzer and pipeline stages of a run, or a no-op one without timings"""
+
+        if self.timings is None:
+            return nullcontext()
+
+        stack = ExitStack()
+        stack.enter_context(self.timings.instrumented(self.analyzer, method_stages(type(self.analyzer),
+                                                                                  ANALYZER_STAGES)))
+        stack.enter_context(self.timings.instrumented(self, PIPELINE_STAGES))
+        start = time.perf_counter_ns()
+        stack.callback(lambda: self.timings.histogram('run').record(time.perf_counter_ns() - start))
+        return stack
+
+    def extractable_rows(self, rows):
+
+        """Yields the (URL_ID, URL) rows whose site has an extraction rule, reporting the others without fetching"""
+
+        for url_id, url in rows:
+            if self.analyzer.can_extract(url):
+                yield url_id, url
+            else:
+                print(f"No extraction rule matches {url}, skipping it")
+
+    def process_page(self, url_id, url, html, pool=None):
+
+        """Parses and analyzes a fetched page, returning its record or None if no article was found.
+
+        With pool (from TextAnalyzer.process_pool), the analysis runs in one of its worker processes.
+        """
+
+        article_title, article_text = self.analyzer.parse_article_html(html, url)
+        if not (article_title and article_text):
+            return None
+
+        if pool is None:
+            metrics = self.analyzer.analyze_text(article_text, self.metrics)
+        else:
+            metrics = self.analyzer.analyze_many([article_text], metrics=self.metrics, executor=pool)[0]
+        return self.record(url_id, url, article_title, article_text, metrics)
+
+    @staticmethod
+    def record(url_id, url, article_title, article_text, metrics):
+        record = dict(metrics)
+        record.update({'URL_ID': url_id, 'URL': url, 'Article_Title': article_title, 'Article_Text': article_text})
+        return record
+
+    def records(self, rows):
+
+        """Yields the records of the (URL_ID, URL) rows in input order, fetching the pages concurrently"""
+
+        url_ids = deque()  # URL_IDs of the URLs handed to the fetcher, which answers in the same order.
+
+        def urls():
+            for url_id, url in self.extractable_rows(rows):
+                url_ids.append(url_id)
+                yield url
+
+        with self.open_fetcher() as fetcher:
+            pages = ((url_ids.popleft(), url, html) for url, html in fetcher.fetch_all(urls()))
+            if self.analysis_workers:
+                yield from self.pooled_records(pages)
+                return
+            for url_id, url, html in pages:
+                record = self.process_page(url_id, url, html)
+                if record is not None:
+                    yield record
+
+    def pooled_records(self, pages):
+
+        """Yields the records of (URL_ID, URL, html) pages in order, analyzed in batches by worker processes.
+
+        Pages are parsed here, then each batch of batch_size articles goes to analyze_many at once, so the
+        workers get whole chunks of texts instead of one article per round trip.
+        """
+
+        batch = []  # (URL_ID, URL, Article_Title, Article_Text) of the articles waiting for analysis.
+
+        def analyze(batch):
+            texts = [article_text for _, _, _, article_text in batch]
+            results = self.analyzer.analyze_many(texts, metrics=self.metrics, executor=pool)
+            return [self.record(*article, metrics) for article, metrics in zip(batch, results)]
+
+        with self.analyzer.process_pool(self.analysis_workers) as pool:
+            for url_id, url, html in pages:
+                article_title, article_text = self.analyzer.parse_article_html(html, url)
+                if article_title and article_text:
+                    batch.append((url_id, url, article_title, article_text))
+                if len(batch) >= self.batch_size:
+                    yield from analyze(batch)
+                    batch = []
+            if batch:
+                yield from analyze(batch)
+
+    async def records_async(self, rows, on_record=None, cpu_executor=None, queue_size=32):
+
+        """Fetches and analyzes (URL_ID, URL) rows, overlapping network waits with analysis.
+
+        Bounded queues between the stages give back-pressure: the fetch stage stops pulling URLs while the
+        CPU stage is behind. Records are passed to on_record in input order as soon as they are ready, or
+        returned as a list when on_record is None.
+        """
+
+        loop = asyncio.get_running_loop()
+        # Bounded CPU stage. With analysis_workers, each thread parses a page and waits on a worker process.
+        cpu_executor = cpu_executor or ThreadPoolExecutor(max_workers=self.analysis_workers or 1)
+        pool = self.analyzer.process_pool(self.analysis_workers) if self.analysis_workers else None
+        fetch_executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        url_queue = asyncio.Queue(maxsize=queue_size)
+        html_queue = asyncio.Queue(maxsize=queue_size)
+        collected = []
+        on_record = on_record or collected.append
+        finished = {}  # Records (or None for pages without an article) waiting for their turn, by input index.
+        next_index = 0
+
+        async def read_urls():
+            for index, (url_id, url) in enumerate(self.extractable_rows(rows)):
+                await url_queue.put((index, url_id, url))
+            for _ in range(self.max_workers):
+                await url_queue.put(None)  # One stop marker per fetch worker.
+
+        async def fetch_pages(fetcher):
+            while (item := await url_queue.get()) is not None:
+                index, url_id, url = item
+                html = await loop.run_in_executor(fetch_executor, fetcher.fetch, url)
+                await html_queue.put((index, url_id, url, html))
+
+        async def analyze_pages():
+            nonlocal next_index
+            while (item := await html_queue.get()) is not None:
+                index, url_id, url, html = item
+                finished[index] = await loop.run_in_executor(cpu_executor, self.process_page, url_id, url, html,
+                                                             pool)
+                while next_index in finished:  # Hands on every record whose predecessors are done.
+                    record = finished.pop(next_index)
+                    next_index += 1
+                    if record is not None:
+                        on_record(record)
+
+        try:
+            with self.open_fetcher() as fetcher:
+                producers = [asyncio.create_task(read_urls())]
+                producers += [asyncio.create_task(fetch_pages(fetcher)) for _ in range(self.max_workers)]
+                producing = asyncio.gather(*producers)
+                # One analysis task per worker process keeps that many pages in the pool at once.
+                analyzers = [asyncio.create_task(analyze_pages()) for _ in range(self.analysis_workers or 1)]
+                analyzing = asyncio.gather(*analyzers)
+                try:
+                    # The analysis stage only stops early by failing; then nothing drains html_queue any more, so
+                    # the fetch stage would block on it forever instead of finishing.
+                    done, _ = await asyncio.wait([producing, analyzing], return_when=asyncio.FIRST_COMPLETED)
+                    if analyzing in done:
+                        analyzing.result()  # Re-raises the analysis error.
+                    await producing  # Re-raises a read or fetch error.
+                    for _ in analyzers:
+                        await html_queue.put(None)  # One stop marker per analysis task.
+                    await analyzing
+                finally:
+                    for task in [*producers, *analyzers]:
+                        task.cancel()  # No-op for the finished ones, stops the others after a failure.
+                    await asyncio.gather(producing, analyzing, return_exceptions=True)
+        finally:
+            fetch_executor.shutdown()
+            cpu_executor.shutdown()
+            if pool is not None:
+                pool.shutdown()
+
+        return collected
+
+    def open_writers(self, resume=False):
+
+        """Returns one IncrementalWriter per output schema, appending to the previous output when resuming"""
+
+        writers = [IncrementalWriter(schema, self.output_format, self.batch_size, self.excel, append=resume)
+                   for schema in self.schemas]
+        if self.timings:
+            for writer in writers:
+                self.timings.instrument(writer, WRITER_STAGES)
+        return writers
+
+    def pending_rows(self, rows, writers):
+
+        """Yields the rows not yet completed in every output, per the writers' checkpoints"""
+
+        completed = set.intersection(*(writer.completed_ids() for writer in writers)) if writers else set()
+        print(f"Resuming: {len(completed)} URL_IDs already completed, skipping them")
+        for url_id, url in rows:
+            if str(url_id) not in completed:
+                yield url_id, url
+
+    def write(self, record, writers):
+        for writer in writers:
+            writer.add(record)
+
+    def report(self):
+        if self.cache:
+            print(self.cache.report())
+        if self.result_cache:
+            print(self.result_cache.report())
+        if self.timings:
+            self.report_timings()
+
+    def report_timings(self):
+
+        """Prints the stage timings summary and writes the JSON report, with the cache counters"""
+
+        if self.cache:
+            self.timings.counters.update({'http_cache.revalidated': self.cache.revalidated,
+                                          'http_cache.downloaded': self.cache.downloaded})
+        if self.result_cache:
+            self.timings.counters.update({'analysis_cache.hits': self.result_cache.hits,
+                                          'analysis_cache.misses': self.result_cache.misses})
+        print(self.timings.summary())
+        self.timings.write_json(self.timings_path)
+        print(f"Stage timings saved to {self.timings_path}")
+
+    def run(self, rows, resume=False):
+
+        """Runs the whole pipeline over (URL_ID, URL) rows, streaming the records to the output writers.
+
+        With resume, rows completed by a previous run are skipped and the new records are appended.
+        """
+
+        with self.analysis_cache(), self.instrumented():
+            writers = self.open_writers(resume)
+            if resume:
+                rows = self.pending_rows(rows, writers)
+            try:
+                for record in self.records(rows):
+                    self.write(record, writers)
+            finally:
+                for writer in writers:
+                    writer.flush()  # Whatever was completed is kept, even if the run failed.
+            for writer in writers:
+                writer.close()
+        self.report()
+
+    async def run_async(self, rows, resume=False):
+
+        """Runs the whole pipeline over (URL_ID, URL) rows with the asyncio fetch and analysis stages"""
+
+        with self.analysis_cache(), self.instrumented():
+            writers = self.open_writers(resume)
+            if resume:
+                rows = self.pending_rows(rows, writers)
+            try:
+                await self.records_async(rows, on_record=lambda record: self.write(record, writers))
+            finally:
+                for writer in writers:
+                    writer.flush()
+            for writer in writers:
+                writer.close()
+        self.report()
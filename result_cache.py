@@ -0,0 +1,129 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+class AnalysisCache:
+
+    """Persistent SQLite store of analyze_text results keyed by article text and analyzer configuration.
+
+    Byte-identical article texts analyzed with the same configuration return their stored metric dict
+    instead of being re-tokenized. Only the max_entries most recently used results are kept.
+
+    Writes are committed every commit_every operations (and on close) rather than one by one, and the
+    used_at updates of hits are buffered until then. Eviction only runs once the row count exceeds
+    max_entries, removing the least recently used evict_fraction of the entries in one go.
+    """
+
+    def __init__(self, path='.analysis_cache.sqlite', max_entries=100000, commit_every=100, evict_fraction=0.1):
+        self.path = path
+        self.max_entries = max_entries
+        self.commit_every = commit_every
+        self.evict_count = max(1, int(max_entries * evict_fraction))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # The connection is shared by the fetch/analysis threads.
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, metrics TEXT NOT NULL, used_at REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at)")
+        self._connection.commit()
+        self._rows = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        self._used = {}  # key -> used_at of the hits not yet written.
+        self._pending = 0  # Operations since the last commit.
+
+    @staticmethod
+    def key(text, config_version):
+
+        """Returns the cache key of an article text analyzed under an analyzer configuration version"""
+
+        return hashlib.sha256(f'{config_version}\0{text}'.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+
+        """Returns the stored metric dict for the key, or None"""
+
+        with self._lock:
+            row = self._connection.execute("SELECT metrics FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used[key] = time.time()
+            self._written()
+            return json.loads(row[0])
+
+    def put(self, key, metrics):
+
+        """Stores a metric dict, evicting the least recently used results past max_entries"""
+
+        with self._lock:
+            self._used.pop(key, None)
+            inserted = self._connection.execute("INSERT OR IGNORE INTO results VALUES (?, ?, ?)",
+                                                (key, json.dumps(metrics), time.time())).rowcount
+            if inserted:
+                self._rows += 1
+            else:
+                self._connection.execute("UPDATE results SET metrics = ?, used_at = ? WHERE key = ?",
+                                         (json.dumps(metrics), time.time(), key))
+            if self._rows > self.max_entries:
+                self._evict()
+            self._written()
+
+    def _written(self):
+
+        """Counts a write, committing the buffered ones every commit_every"""
+
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._commit()
+
+    def _commit(self):
+        if self._used:
+            self._connection.executemany("UPDATE results SET used_at = ? WHERE key = ?",
+                                         [(used_at, key) for key, used_at in self._used.items()])
+            self._used.clear()
+        self._connection.commit()
+        self._pending = 0
+
+    def _evict(self):
+
+        """Removes the least recently used entries, down to max_entries minus a batch of evict_count"""
+
+        self._commit()  # Recency of the buffered hits counts.
+        excess = self._rows - self.max_entries + self.evict_count
+        self._rows -= self._connection.execute(
+            "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY used_at LIMIT ?)", (excess,)).rowcount
+
+    def flush(self):
+
+        """Commits the buffered writes"""
+
+        with self._lock:
+            self._commit()
+
+    def clear(self):
+
+        """Invalidates every stored result, returning how many were removed"""
+
+        with self._lock:
+            self._used.clear()
+            removed = self._connection.execute("DELETE FROM results").rowcount
+            self._connection.commit()
+            self._rows = 0
+            self._pending = 0
+            return removed
+
+    def report(self):
+
+        """Returns a one line summary of the cache hit rate"""
+
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0
+        return f"Analysis cache: {self.hits} hits, {self.misses} misses, hit rate {hit_rate:.1f}%"
+
+    def close(self):
+        self.flush()
+        self._connection.close()
@@ -1,68 +1,262 @@
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
 import nltk
-from nltk.tokenize import word_tokenize, sent_tokenize
 from nltk.corpus import stopwords, opinion_lexicon
+from collections import namedtuple
+from functools import lru_cache
 import re
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from contextlib import nullcontext
+from fetcher import ArticleFetcher, HttpCache
+from result_cache import AnalysisCache
+from pipeline import ANALYSIS_SCHEMA, SCHEMAS, TEXT_COLUMN_MODES, Pipeline
+from url_sources import read_urls
+from output_writers import OUTPUT_FORMATS
+from vectorized import Vocabulary, score_batch
+from tokenization import TOKENIZERS, get_tokenizer
+from document import METRICS, AnalyzedDocument, metric_name, plan_metrics
+from extraction import default_parser, default_rules
+
+# NLTK resources used by the analyzer, as (download id, nltk.data path).
+NLTK_RESOURCES = [
+    ('punkt', 'tokenizers/punkt'),
+    ('opinion_lexicon', 'corpora/opinion_lexicon'),
+    ('stopwords', 'corpora/stopwords'),
+]
+
+
+def missing_nltk_resources():
+
+    """Returns the NLTK resources not installed locally (checks local data only, no network)"""
+
+    missing = []
+    for resource_id, path in NLTK_RESOURCES:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(resource_id)
+    return missing
 
-# DOWNLOAD THE NECESSARY RESOURCES!
-nltk.download('punkt')
-nltk.download('opinion_lexicon')
-nltk.download('stopwords')
 
-class TextAnalyzer:
-    def __init__(self):
-        pass
+def provision_nltk_resources():
+
+    """Downloads the NECESSARY RESOURCES that are missing. Run once per machine, not on import"""
+
+    missing = missing_nltk_resources()
+    for resource_id in missing:
+        nltk.download(resource_id)
+    return missing
+
+
+def missing_nltk_message():
+
+    """Returns the pre-flight error for the entry points when NLTK resources are missing, or None"""
+
+    missing = missing_nltk_resources()
+    if missing:
+        return f"Missing NLTK resources: {', '.join(missing)}. Run 'python sentiment_analyzer.py setup' first"
+    return None
+
+
+class Lexicon(namedtuple('Lexicon', ['positive', 'negative'])):
+
+    """Immutable pair of positive and negative word sets used for sentiment scoring"""
+
+    __slots__ = ()
+
+    def __new__(cls, positive, negative):
+        # Frozensets keep the lookups O(1) and make one instance safe to share between analyzers.
+        return super().__new__(cls, frozenset(positive), frozenset(negative))
+
+
+@lru_cache(maxsize=None)
+def load_opinion_lexicon():
+
+    """Loads the NLTK opinion lexicon once per process"""
+
+    return Lexicon(opinion_lexicon.words("positive-words.txt"),  # Positive words from the opinion lexicon.
+                   opinion_lexicon.words("negative-words.txt"))  # Negative words from the opinion lexicon.
+
+
+@lru_cache(maxsize=None)
+def load_stopwords(language='english'):
+
+    """Loads the NLTK stopwords of a language once per process"""
 
-    def extract_article_info(self, url):
+    # Using a set offers faster lookup times compared to using a list, especially for large collections of words.
+    return frozenset(stopwords.words(language))
+
+
+# Bump whenever the metric definitions or the syllable rules change, so cached results are not reused.
+# 2: sentences are segmented on the raw article text instead of the punctuation-free cleaned text.
+METRICS_VERSION = 2
+
+
+class TextAnalyzer:
+    personal_pronouns = frozenset(['i', 'we', 'my', 'ours', 'us'])
+
+    def __init__(self, lexicon=None, stopword_language='english', extra_stopwords=(), remove_stopwords=True,
+                 syllable_cache_size=65536, syllable_table=None, result_cache=None, parser=None,
+                 partial_parse=True, rules=None, tokenizer='nltk', cache_dir='.http_cache'):
+        self._lexicon = lexicon  # A custom Lexicon can be passed in, otherwise the NLTK one is used.
+        self.stopword_language = stopword_language
+        self.extra_stopwords = frozenset(word.lower() for word in extra_stopwords)  # Domain specific stopwords.
+        self.remove_stopwords = remove_stopwords  # False keeps every word.
+        self._stop_words = None
+        self._fetcher = None
+        self.cache_dir = cache_dir  # HttpCache directory of the default fetcher, None disables it.
+        self.parser = parser or default_parser()  # BeautifulSoup backend: lxml when installed, else html.parser.
+        self.partial_parse = partial_parse  # Build only the title and post-content subtrees.
+        self.rules = rules or default_rules()  # Per-site extraction rules, from extraction_rules.json by default.
+        self.tokenizer = get_tokenizer(tokenizer)  # 'nltk', or the faster 'regex' backend.
+
+        # Word frequencies follow Zipf's law, so a bounded memo serves almost every syllable lookup.
+        self.syllable_cache_size = syllable_cache_size
+        self._memoized_syllables = lru_cache(maxsize=syllable_cache_size)(self._syllables_in_word)
+        self.syllable_table = dict(syllable_table or {})  # Precomputed word -> syllables, checked first.
+
+        self.result_cache = result_cache  # Optional AnalysisCache in front of analyze_text.
+        self._config_version = None
+        self._vocabulary = None
+
+    def _init_kwargs(self):
+
+        """Returns the constructor arguments needed to rebuild an equivalent analyzer in a worker process"""
+
+        return {'lexicon': self._lexicon, 'stopword_language': self.stopword_language,
+                'extra_stopwords': self.extra_stopwords, 'remove_stopwords': self.remove_stopwords,
+                'syllable_cache_size': self.syllable_cache_size, 'syllable_table': self.syllable_table,
+                'parser': self.parser, 'partial_parse': self.partial_parse, 'rules': self.rules,
+                'tokenizer': self.tokenizer.name, 'cache_dir': self.cache_dir}
+
+    @property
+    def lexicon(self):
+
+        """Returns the lexicon, loading the shared NLTK opinion lexicon on first use"""
+
+        if self._lexicon is None:
+            self._lexicon = load_opinion_lexicon()
+        return self._lexicon
+
+    @property
+    def config_version(self):
+
+        """Returns a digest of everything that affects the metrics: lexicon, stopwords and syllable rules"""
+
+        if self._config_version is None:
+            config = {
+                'metrics': METRICS_VERSION,
+                'tokenizer': self.tokenizer.name,
+                'positive': sorted(self.lexicon.positive),
+                'negative': sorted(self.lexicon.negative),
+                'stop_words': sorted(self.stop_words),
+                'syllable_table': sorted(self.syllable_table.items()),
+            }
+            self._config_version = hashlib.sha256(json.dumps(config).encode('utf-8')).hexdigest()
+        return self._config_version
+
+    @property
+    def vocabulary(self):
+
+        """Returns the analyzer's interned token Vocabulary, created on first use"""
+
+        if self._vocabulary is None:
+            self._vocabulary = Vocabulary(self)
+        return self._vocabulary
+
+    @property
+    def stop_words(self):
+
+        """Returns the frozen set of stopwords removed by clean_text, built on first use"""
+
+        if self._stop_words is None:
+            if self.remove_stopwords:
+                self._stop_words = load_stopwords(self.stopword_language) | self.extra_stopwords
+            else:
+                self._stop_words = frozenset()
+        return self._stop_words
+
+    def extract_article_info(self, url, fetcher=None):
 
         """Extracts article title and text from a URL"""
 
-        try:
-            response = requests.get(url)  # Sending an HTTP GET request to the URL.
-            soup = BeautifulSoup(response.text, 'html.parser')  # Parsing the HTML content of the response.
+        if not self.can_extract(url):
+            return None, None  # No extraction rule for the site, so the download is skipped.
+        fetcher = fetcher or self.fetcher
+        html = fetcher.fetch(url)  # Sending an HTTP GET request to the URL over the pooled session.
+        return self.parse_article_html(html, url)
+
+    def can_extract(self, url):
+
+        """Tells whether an extraction rule matches the URL, before anything is downloaded"""
+
+        return self.rules.match(url) is not None
+
+    def parse_article_html(self, html, url=None):
 
-            # Extracting article title.
-            article_title = None
-            entry_title = soup.find('h1', class_='entry-title')  # Finding the HTML element with class 'entry-title'.
-            if entry_title:
-                article_title = entry_title.get_text().strip()  # Extracting and stripping the text of the element.
+        """Extracts article title and text from the HTML of an article page, using the URL's extraction rule"""
 
-            # Extracting article text
-            article_text = None
-            article_content = soup.find('div', class_='td-post-content tagdiv-type')  # Finding the HTML element with
-                                                                                # class 'td-post-content tagdiv-type'.
-            if article_content:
-                article_text = article_content.get_text().strip()  # Extracting and stripping the text of the element.
+        rule = self.rules.match(url)
+        if html is None or rule is None:  # The page could not be fetched, or its site has no extraction rule.
+            return None, None
 
-            return article_title, article_text  # Returns the article title and text(TO BE USED DURING SENTIMENT ANALYSIS)
+        try:
+            return rule.extract(html, self.parser, self.partial_parse)
 
         except Exception as e:
-            print(f"Error occurred while extracting article info from {url}: {e}")   # CATCHING THE EXCEPTION!!!
+            print(f"Error occurred while extracting article info: {e}")   # CATCHING THE EXCEPTION!!!
             return None, None
 
+    @property
+    def fetcher(self):
+
+        """Returns the analyzer's shared ArticleFetcher, revalidating against cache_dir, creating it on first use"""
+
+        if self._fetcher is None:
+            self._fetcher = ArticleFetcher(cache=HttpCache(self.cache_dir) if self.cache_dir else None)
+        return self._fetcher
+
     def clean_text(self, text):
 
         """Performs cleaning of the text"""
 
-        tokens = word_tokenize(text)  # Tokenizing the text into words...
-        words = [word.lower() for word in tokens if word.isalnum()]  # Removing punctuations and converting to lowercase.
-        stop_words = set(stopwords.words('english')) # Getting English stopwords: Here instead of a set, a list can also
-        # be used. But using a set offers faster lookup times compared to using a list, especially for large
-        # collections of words.
+        words = self.tokenizer.clean_words(text)  # Tokenizing the text into lowercase words, without punctuations.
+        stop_words = self.stop_words  # Getting the stopwords, loaded once per analyzer.
 
         words = [word for word in words if word not in stop_words]  # Removing the stopwords!
         cleaned_text = ' '.join(words)  # Joining the words into a single string...
 
         return cleaned_text  # Returns the cleaned text.
 
+    def analyze_document(self, text, sentences=True):
+
+        """Segments the raw text into sentences once and cleans the tokens of each, keeping the boundaries.
+
+        The returned AnalyzedDocument computes its metrics lazily; analyze_text is analyze_document(text).to_dict().
+        With sentences=False no sentence boundaries are kept. The regex backend then skips segmentation; the
+        NLTK one still segments internally, as word_tokenize splits the text into sentences itself.
+        """
+
+        stop_words = self.stop_words
+        if not sentences:
+            tokens = [word for word in self.tokenizer.clean_words(text) if word not in stop_words]
+            return AnalyzedDocument(self.vocabulary.encode(tokens), None, self.vocabulary)
+
+        tokens = []
+        sentence_offsets = [0]
+        for sentence in self.tokenizer.sentences(text):
+            tokens.extend(word for word in self.tokenizer.clean_sentence_words(sentence) if word not in stop_words)
+            sentence_offsets.append(len(tokens))
+        return AnalyzedDocument(self.vocabulary.encode(tokens), sentence_offsets, self.vocabulary)
+
     def sentiment_analysis(self, text):
 
         """Performs sentiment analysis"""
 
-        positive_words = set(opinion_lexicon.words("positive-words.txt"))  # Getting positive words from the opinion lexicon.
-        negative_words = set(opinion_lexicon.words("negative-words.txt"))  # Getting negative words from the opinion lexicon.
+        positive_words = self.lexicon.positive  # Loaded once and shared, instead of rebuilt for every article.
+        negative_words = self.lexicon.negative
         positive_score = sum(1 for word in text if word in positive_words)   # Counting positive words in the text.
 
         negative_score = sum(1 for word in text if word in negative_words)  # Counting negative words in the text.
@@ -78,12 +272,9 @@ class TextAnalyzer:
 
         """Performs readability analysis"""
 
-        sentences = sent_tokenize(text)  # Tokenizing the text into sentence
-        num_sentences = len(sentences)  # Counting the number of sentences.
-        total_words = sum(len(word_tokenize(sentence)) for sentence in sentences)  # Counting the total number of words.
-
-        avg_words_per_sentence = total_words / num_sentences  # Calculates average words per sentence.
-        words = self.clean_text(text).split()  # Cleaning the text and splitting into words.
+        document = self.analyze_document(text)  # Sentences segmented once, each tokenized once.
+        avg_words_per_sentence = document.average_sentence_length  # Calculates average words per sentence.
+        words = document.tokens  # The cleaned words.
 
         # Counting complex words based on length and syllable count.
         complex_word_count = sum(1 for word in words if len(word) > 6 and self.count_syllables(word) > 3)
@@ -94,7 +285,33 @@ class TextAnalyzer:
 
     def count_syllables(self, word):
 
-        """Counts syllables in a word"""
+        """Counts syllables in a word, using the precomputed table and the LRU memo before the character loop"""
+
+        syllables = self.syllable_table.get(word)
+        if syllables is None:
+            syllables = self._memoized_syllables(word)
+        return syllables
+
+    def syllable_cache_info(self):
+
+        """Returns the hits, misses, maxsize and current size of the syllable memo"""
+
+        return self._memoized_syllables.cache_info()
+
+    def build_syllable_table(self, words):
+
+        """Precomputes the syllable counts of a vocabulary (e.g. the cleaned words of a corpus)"""
+
+        for word in set(words):
+            self.syllable_table[word] = self._syllables_in_word(word)
+        self._config_version = None
+        self._vocabulary = None
+        return self.syllable_table
+
+    @staticmethod
+    def _syllables_in_word(word):
+
+        """Counts syllables in a word by walking its characters"""
 
         vowels = 'aeiou'
         syllables = 0
@@ -136,58 +353,190 @@ class TextAnalyzer:
 
         return total_characters / len(words)  # Calculates average word length...
 
-    def analyze_text(self, text):
-
-        """Analyzes text and returns various metrics"""
-
-        cleaned_text = self.clean_text(text)
-        tokenized_text = word_tokenize(cleaned_text)
-        positive_score, negative_score, polarity_score, subjectivity_score = self.sentiment_analysis(tokenized_text)
-        avg_words_per_sentence, complex_word_count, fog_index = self.readability_analysis(cleaned_text)
-        syllable_per_word = self.syllable_count_per_word(cleaned_text)
-        personal_pronouns = self.count_personal_pronouns(cleaned_text)
-        avg_word_length = self.average_word_length(cleaned_text)
-
-        return {
-            'POSITIVE SCORE': positive_score,
-            'NEGATIVE SCORE': negative_score,
-            'POLARITY SCORE': polarity_score,
-            'SUBJECTIVITY SCORE': subjectivity_score,
-            'AVG SENTENCE LENGTH': avg_words_per_sentence,
-            'PERCENTAGE OF COMPLEX WORDS': complex_word_count / len(tokenized_text),
-            'FOG INDEX': fog_index,
-            'AVG NUMBER OF WORDS PER SENTENCE': avg_words_per_sentence,
-            'COMPLEX WORD COUNT': complex_word_count,
-            'WORD COUNT': len(tokenized_text),
-            'SYLLABLE PER WORD': syllable_per_word,
-            'PERSONAL PRONOUNS': personal_pronouns,
-            'AVG WORD LENGTH': avg_word_length
-        }
+    def analyze_text(self, text, metrics=None):
 
+        """Analyzes text and returns various metrics.
 
-analyzer = TextAnalyzer() # Instantiate TextAnalyzer
+        metrics names the wanted output columns (all of them by default); the token counts they do not need,
+        such as syllables, are skipped, and so is sentence segmentation with the regex tokenizer.
+        """
+
+        plan = plan_metrics(metrics)
+        if self.result_cache is None:
+            return self._compute_metrics(text, plan)
+
+        key = self._cache_key(text, plan)
+        results = self.result_cache.get(key)
+        if results is None:
+            results = self._compute_metrics(text, plan)
+            self.result_cache.put(key, results)
+        return results
+
+    def _cache_key(self, text, plan):
+
+        """Returns the result cache key of a text, under the analyzer configuration and the metric selection"""
+
+        config_version = self.config_version
+        if not plan.complete:  # Partial results are stored apart from the full ones.
+            config_version = f"{config_version}:{','.join(plan.metrics)}"
+        return self.result_cache.key(text, config_version)
+
+    def _compute_metrics(self, text, plan):
+
+        """Computes the planned metrics of analyze_text without consulting the result cache"""
+
+        # Segmenting, tokenizing and cleaning happen once per article, then the needed counts are gathered together.
+        return self.analyze_document(text, sentences=plan.sentences).to_dict(plan.metrics)
+
+    def analyze_batch(self, texts, metrics=None):
 
+        """Analyzes a batch of texts with vectorized scoring over a document-term matrix.
 
-def main():
-    df = pd.read_excel('input.xlsx')
+        Gives the same metric dicts as analyze_text. Only the counting is vectorized: tokenization still runs
+        article by article and dominates, so the batch path is about 1.1-1.4x faster (benchmarks.py batch).
+        """
 
-    results = []
+        return score_batch(self, texts, metrics)
 
-    for index, row in df.iterrows():
-        url_id = row['URL_ID']
-        url = row['URL']
-        article_title, article_text = analyzer.extract_article_info(url)
+    def process_pool(self, workers=None):
+
+        """Returns a process pool whose workers each hold an equivalent analyzer, to pass to analyze_many"""
+
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self._init_kwargs(),))
+
+    def analyze_many(self, texts, workers=None, chunksize=16, metrics=None, executor=None):
+
+        """Analyzes many texts over a process pool, returning the metric dicts in input order.
+
+        analyze_text is pure Python CPU work, so threads would serialize on the GIL. Texts are sent to the
+        workers in chunks to cut pickling overhead; workers=1 runs serially in this process. An executor from
+        process_pool is reused (and left open) instead of starting a pool for the call.
+        """
+
+        if workers == 1 and executor is None:
+            return [self.analyze_text(text, metrics) for text in texts]
+
+        plan = plan_metrics(metrics)
+        texts = list(texts)
+        results = [None] * len(texts)
+        keys = [None] * len(texts)
+        if self.result_cache is not None:  # Cached results are served here, only the misses go to the pool.
+            for index, text in enumerate(texts):
+                keys[index] = self._cache_key(text, plan)
+                results[index] = self.result_cache.get(keys[index])
+        pending = [index for index, result in enumerate(results) if result is None]
+        if not pending:
+            return results  # All cache hits: no pool to start.
+
+        with nullcontext(executor) if executor else self.process_pool(workers) as pool:
+            computed = pool.map(partial(_analyze_in_worker, metrics=plan.metrics),
+                                [texts[index] for index in pending], chunksize=chunksize)
+            for index, result in zip(pending, computed):
+                results[index] = result
+                if self.result_cache is not None:
+                    self.result_cache.put(keys[index], result)
+        return results
+
+
+_worker_analyzer = None  # The analyzer of a worker process, created once by _init_worker.
+
+
+def _init_worker(init_kwargs):
+
+    """Process pool initializer: builds the worker's analyzer and loads its resources once"""
+
+    global _worker_analyzer
+    _worker_analyzer = TextAnalyzer(**init_kwargs)
+    _worker_analyzer.lexicon  # Loading the lexicon...
+    # ...and the punkt model up front, not on the first article.
+    _worker_analyzer.tokenizer.sentences("Loads the punkt model. Once.")
+
+
+def _analyze_in_worker(text, metrics=None):
+    return _worker_analyzer.analyze_text(text, metrics)
+
+
+analyzer = TextAnalyzer() # Instantiate TextAnalyzer
 
-        if article_title and article_text:
-            analysis_results = analyzer.analyze_text(article_text)
-            analysis_results['URL_ID'] = url_id
-            analysis_results['URL'] = url
-            results.append(analysis_results)
 
-    output_df = pd.DataFrame(results)
-    output_df.to_excel('Output.xlsx', index=False)
-    print("Extraction completed. Output saved to Output.xlsx")
+def main(max_workers=8, per_host=4, cache_dir='.http_cache', result_cache_path='.analysis_cache.sqlite',
+         schemas=(ANALYSIS_SCHEMA,), input_file='input.xlsx', output_format='csv', batch_size=100, excel=True,
+         resume=False, text_column='inline', metrics=None, timings_path=None, analysis_workers=None):
+    pipeline = Pipeline(analyzer, schemas, max_workers=max_workers, per_host=per_host, cache_dir=cache_dir,
+                        result_cache_path=result_cache_path, output_format=output_format, batch_size=batch_size,
+                        excel=excel, text_column=text_column, metrics=metrics, timings_path=timings_path,
+                        analysis_workers=analysis_workers)
+    # Pages are downloaded concurrently but come back in input order, keeping Output.xlsx rows stable.
+    pipeline.run(read_urls(input_file), resume=resume)  # URLs are streamed from the input, not loaded up front.
+
+
+async def async_main(max_workers=8, per_host=4, cache_dir='.http_cache',
+                     result_cache_path='.analysis_cache.sqlite', schemas=(ANALYSIS_SCHEMA,), input_file='input.xlsx',
+                     output_format='csv', batch_size=100, excel=True, resume=False, text_column='inline',
+                     metrics=None, timings_path=None, analysis_workers=None):
+    pipeline = Pipeline(analyzer, schemas, max_workers=max_workers, per_host=per_host, cache_dir=cache_dir,
+                        result_cache_path=result_cache_path, output_format=output_format, batch_size=batch_size,
+                        excel=excel, text_column=text_column, metrics=metrics, timings_path=timings_path,
+                        analysis_workers=analysis_workers)
+    await pipeline.run_async(read_urls(input_file), resume=resume)
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Sentiment and readability analysis of scraped articles")
+    parser.add_argument('command', nargs='?', choices=['run', 'setup', 'clear-cache'], default='run',
+                        help="'setup' downloads the missing NLTK resources, 'clear-cache' invalidates the stored "
+                             "analysis results, 'run' analyzes the input file")
+    parser.add_argument('--outputs', nargs='+', choices=sorted(SCHEMAS), default=['analysis'],
+                        help="output layouts written from the single fetch pass: 'analysis' (Output.xlsx) and/or "
+                             "'articles' (extracted_articles.xlsx)")
+    parser.add_argument('--input', default='input.xlsx',
+                        help="URL list: Excel (.xlsx), .csv or .jsonl with URL_ID/URL columns, or .txt with one URL "
+                             "per line")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv',
+                        help="append-friendly format the results are flushed to in batches (parquet needs pyarrow)")
+    parser.add_argument('--text', choices=TEXT_COLUMN_MODES, default='inline',
+                        help="where the full Article_Text goes: in the output, in a separate file keyed by URL_ID, "
+                             "or nowhere")
+    parser.add_argument('--batch-size', type=int, default=100, help="results per flush and checkpoint")
+    parser.add_argument('--no-excel', action='store_true', help="skip converting the output to Excel at the end")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip the URL_IDs completed by a previous run and append to its output")
+    parser.add_argument('--tokenizer', choices=sorted(TOKENIZERS), default='nltk',
+                        help="word/sentence tokenizer backend; 'regex' is several times faster than NLTK")
+    parser.add_argument('--metrics', nargs='+', type=metric_name, metavar='METRIC',
+                        help="compute and write only these metrics, e.g. 'polarity-score subjectivity-score'; the "
+                             "counts they do not need (e.g. syllables) are skipped, and with --tokenizer regex "
+                             "sentence segmentation too (default: all of "
+                             f"{', '.join(name.lower().replace(' ', '-') for name in METRICS)})")
+    parser.add_argument('--timings', nargs='?', const='timings.json', metavar='PATH',
+                        help="time every stage (fetch, parse, tokenization, syllables, write, excel, ...), print "
+                             "a p50/p95/p99 summary at the end and write the JSON report to PATH "
+                             "(default: timings.json)")
+    parser.add_argument('--analysis-workers', type=int, metavar='N',
+                        help="analyze the articles over N worker processes instead of in the main process")
+    args = parser.parse_args(argv)
+
+    if args.command == 'clear-cache':
+        cache = AnalysisCache()
+        removed = cache.clear()
+        cache.close()
+        print(f"Removed {removed} cached analysis results")
+        return
+
+    if args.command == 'setup':
+        downloaded = provision_nltk_resources()
+        print(f"Downloaded: {', '.join(downloaded)}" if downloaded else "All NLTK resources are already installed")
+        return
+
+    message = missing_nltk_message()  # Checked before any page is fetched.
+    if message:
+        parser.exit(1, message + '\n')
+    analyzer.tokenizer = get_tokenizer(args.tokenizer)
+    main(schemas=[SCHEMAS[name] for name in args.outputs], input_file=args.input, output_format=args.format,
+         batch_size=args.batch_size, excel=not args.no_excel, resume=args.resume,
+         text_column=args.text, metrics=args.metrics, timings_path=args.timings,
+         analysis_workers=args.analysis_workers)
 
 
 if __name__ == "__main__":
-    main()
+    cli()
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The modules live flat at the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_analyzer import missing_nltk_resources  # noqa: E402
+
+
+@pytest.fixture
+def nltk_data():
+
+    """Skips the test when the NLTK data is not installed (python sentiment_analyzer.py setup)"""
+
+    missing = missing_nltk_resources()
+    if missing:
+        pytest.skip(f"Missing NLTK resources: {', '.join(missing)}")
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from extraction import RuleRegistry, default_rules
+
+# Helpers shared by the tests and benchmarks.py: the article corpus, a local article server and metric drift.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Resolved next to the modules, so the tests run from any directory.
+CORPUS_FILE = os.path.join(ROOT, 'extracted_articles.xlsx')
+
+
+def load_corpus(path=CORPUS_FILE):
+
+    """Loads the article texts used by the benchmarks and tests"""
+
+    df = pd.read_excel(path)
+    return [text for text in df['Article_Text'].dropna()]
+
+
+def serve_articles(texts, delay):
+
+    """Starts a local server answering /<n> with article n after a delay, returns (server, base_url).
+
+    delay is in seconds, or a function of n. Pages carry an ETag and are revalidated with 304 Not Modified.
+    Connections are kept alive as on real sites, and the server records the client connections it saw, the
+    peak number of requests in flight and the order it answered in.
+    """
+
+    pages = [f'<h1 class="entry-title">Article {n}</h1><div class="td-post-content tagdiv-type">{text}</div>'.encode()
+             for n, text in enumerate(texts)]
+    lock = threading.Lock()
+
+    class SlowHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive, so connections can be reused.
+
+        def do_GET(self):
+            n = int(self.path.strip('/'))
+            with lock:
+                server.connections.add(self.client_address)
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            time.sleep(delay(n) if callable(delay) else delay)  # Simulates a slow responding site.
+            with lock:
+                server.in_flight -= 1
+                server.answered.append(n)
+            etag = f'"{n}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = pages[n]
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    server.daemon_threads = True
+    server.connections = set()
+    server.in_flight = server.max_in_flight = 0
+    server.answered = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def local_rules():
+
+    """Returns the bundled rules with the tagdiv rule as the opt-in default, for the pages of serve_articles"""
+
+    return RuleRegistry(default_rules().rules, default='tagdiv')
+
+
+def metric_drift(reference, analyzer, texts):
+
+    """Returns {metric: (mean, max)} relative drift of the analyzer's metrics from the reference analyzer's"""
+
+    drifts = {}
+    for text in texts:
+        expected = reference.analyze_text(text)
+        for name, value in analyzer.analyze_text(text).items():
+            drifts.setdefault(name, []).append(abs(value - expected[name]) / (abs(expected[name]) or 1))
+    return {name: (sum(values) / len(values), max(values)) for name, values in drifts.items()}
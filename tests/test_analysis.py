@@ -0,0 +1,45 @@
+import pytest
+
+from support import load_corpus
+from result_cache import AnalysisCache
+from sentiment_analyzer import TextAnalyzer
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    return load_corpus()[:30]
+
+
+@pytest.mark.parametrize('tokenizer', ['nltk', 'regex'])
+def test_analyze_batch_matches_analyze_text(tokenizer, corpus, nltk_data):
+    expected = [TextAnalyzer(tokenizer=tokenizer).analyze_text(text) for text in corpus]
+    assert TextAnalyzer(tokenizer=tokenizer).analyze_batch(corpus) == expected
+
+
+def test_analyze_many_matches_analyze_text(corpus, nltk_data):
+    expected = [TextAnalyzer().analyze_text(text) for text in corpus[:6]]
+    assert TextAnalyzer().analyze_many(corpus[:6], workers=2, chunksize=2) == expected
+
+
+def test_analyze_many_serves_cache_hits_without_a_pool(tmp_path, monkeypatch, corpus, nltk_data):
+    analyzer = TextAnalyzer(result_cache=AnalysisCache(str(tmp_path / 'cache.sqlite')))
+    expected = [analyzer.analyze_text(text) for text in corpus[:6]]
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("No process pool should start when every text is cached")
+
+    monkeypatch.setattr('sentiment_analyzer.ProcessPoolExecutor', no_pool)
+    assert analyzer.analyze_many(corpus[:6], workers=2) == expected
+
+
+def test_document_metrics_are_lazy_and_match_analyze_text(corpus, nltk_data):
+    analyzer = TextAnalyzer()
+    document = analyzer.analyze_document(corpus[0])
+    polarity = document.polarity_score
+    assert set(document._counts) == {'positive_score', 'negative_score'}  # Only what polarity reads.
+
+    metrics = document.to_dict()
+    assert metrics == analyzer.analyze_text(corpus[0])
+    assert metrics['POLARITY SCORE'] == polarity
+    assert document.tokens == [analyzer.vocabulary.words[token_id] for token_id in document.token_ids]
+    assert sum(document.sentence_lengths) == document.token_count
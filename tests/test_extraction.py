@@ -0,0 +1,30 @@
+from extraction import RuleRegistry, default_rules
+from sentiment_analyzer import TextAnalyzer
+
+PAGE = ('<html><body><div class="sidebar">Menu</div><h1 class="entry-title">Title</h1>'
+        '<div class="td-post-content tagdiv-type">Article text.</div></body></html>')
+
+
+def test_bundled_rules_only_match_known_sites():
+    rules = default_rules()
+    assert rules.default is None
+    assert rules.match('https://insights.blackcoffer.com/rising-it-cities/').name == 'tagdiv'
+    assert rules.match('https://www.wikipedia.com/') is None
+    assert rules.match('https://example.com/insights.blackcoffer.com/') is None
+
+
+def test_unknown_site_is_skipped_before_fetching():
+    class FailingFetcher:
+        def fetch(self, url):
+            raise AssertionError(f"{url} should not be downloaded")
+
+    analyzer = TextAnalyzer()
+    assert not analyzer.can_extract('https://www.wikipedia.com/')
+    assert analyzer.extract_article_info('https://www.wikipedia.com/', fetcher=FailingFetcher()) == (None, None)
+
+
+def test_default_rule_is_opt_in():
+    rules = RuleRegistry(default_rules().rules, default='tagdiv')
+    analyzer = TextAnalyzer(rules=rules)
+    assert analyzer.can_extract('http://127.0.0.1:8000/1')
+    assert analyzer.parse_article_html(PAGE, 'http://127.0.0.1:8000/1') == ('Title', 'Article text.')
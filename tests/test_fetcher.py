@@ -0,0 +1,135 @@
+import json
+import time
+
+from support import local_rules, serve_articles
+from fetcher import ArticleFetcher, HttpCache
+from sentiment_analyzer import TextAnalyzer
+
+TEXTS = [f'Article text {n}.' for n in range(12)]
+
+
+def test_fetch_all_yields_in_input_order():
+    # Later URLs answer first.
+    server, base_url = serve_articles(TEXTS, delay=lambda n: (len(TEXTS) - n) * 0.02)
+    urls = [f'{base_url}/{n}' for n in range(len(TEXTS))]
+    try:
+        with ArticleFetcher(max_workers=len(TEXTS), per_host=len(TEXTS)) as fetcher:
+            results = list(fetcher.fetch_all(urls))
+    finally:
+        server.shutdown()
+
+    assert server.answered != sorted(server.answered)  # The responses did finish out of order...
+    assert [url for url, _ in results] == urls  # ...but come back in input order.
+    assert all(f'Article text {n}.' in html for n, (_, html) in enumerate(results))
+
+
+def test_per_host_caps_requests_in_flight():
+    server, base_url = serve_articles(TEXTS, delay=0.05)
+    try:
+        with ArticleFetcher(max_workers=8, per_host=2) as fetcher:
+            results = list(fetcher.fetch_all(f'{base_url}/{n}' for n in range(len(TEXTS))))
+    finally:
+        server.shutdown()
+
+    assert all(html for _, html in results)
+    assert server.max_in_flight == 2
+
+
+def test_session_connections_are_reused():
+    server, base_url = serve_articles(TEXTS, delay=0)
+    try:
+        with ArticleFetcher(max_workers=2, per_host=2) as fetcher:
+            results = list(fetcher.fetch_all(f'{base_url}/{n}' for n in range(len(TEXTS))))
+    finally:
+        server.shutdown()
+
+    assert len(results) == len(TEXTS)
+    assert len(server.connections) <= 2  # Keep-alive connections of the pool, not one per URL.
+
+
+def fetch_through_cache(cache, url):
+    with ArticleFetcher(cache=cache) as fetcher:
+        return fetcher.fetch(url)
+
+
+def test_cache_revalidates_unchanged_pages(tmp_path):
+    server, base_url = serve_articles(TEXTS, delay=0)
+    try:
+        first = fetch_through_cache(HttpCache(str(tmp_path)), f'{base_url}/1')
+        cache = HttpCache(str(tmp_path))
+        assert fetch_through_cache(cache, f'{base_url}/1') == first
+    finally:
+        server.shutdown()
+    assert (cache.revalidated, cache.downloaded) == (1, 0)
+
+
+def test_cache_skips_truncated_entries(tmp_path):
+    server, base_url = serve_articles(TEXTS, delay=0)
+    try:
+        fetch_through_cache(HttpCache(str(tmp_path)), f'{base_url}/1')
+        meta_path = next(tmp_path.glob('*.json'))
+        meta_path.write_text(meta_path.read_text()[:10])  # A run killed mid-write.
+
+        cache = HttpCache(str(tmp_path))
+        assert 'Article text 1.' in fetch_through_cache(cache, f'{base_url}/1')
+    finally:
+        server.shutdown()
+    assert (cache.revalidated, cache.downloaded) == (0, 1)
+
+
+def test_cache_persists_last_use(tmp_path):
+    server, base_url = serve_articles(TEXTS, delay=0)
+    try:
+        fetch_through_cache(HttpCache(str(tmp_path)), f'{base_url}/1')
+        stored = json.loads(next(tmp_path.glob('*.json')).read_text())['used_at']
+        time.sleep(0.01)
+        fetch_through_cache(HttpCache(str(tmp_path)), f'{base_url}/1')
+    finally:
+        server.shutdown()
+    assert json.loads(next(tmp_path.glob('*.json')).read_text())['used_at'] > stored
+
+
+def test_cache_refetches_body_evicted_after_lookup(tmp_path):
+    server, base_url = serve_articles(TEXTS, delay=0)
+    try:
+        fetch_through_cache(HttpCache(str(tmp_path)), f'{base_url}/1')
+        cache = HttpCache(str(tmp_path))
+        lookup = cache.lookup
+
+        def lookup_then_evict(url):
+            meta = lookup(url)
+            next(tmp_path.glob('*.gz')).unlink()  # Evicted between the lookup and the 304.
+            return meta
+
+        cache.lookup = lookup_then_evict
+        assert 'Article text 1.' in fetch_through_cache(cache, f'{base_url}/1')
+    finally:
+        server.shutdown()
+    assert (cache.revalidated, cache.downloaded) == (0, 1)
+
+
+def test_cache_evicts_least_recently_used_to_stay_under_max_bytes(tmp_path):
+    server, base_url = serve_articles(TEXTS, delay=0)
+    try:
+        cache = HttpCache(str(tmp_path))
+        with ArticleFetcher(cache=cache) as fetcher:
+            fetcher.fetch(f'{base_url}/0')
+            cache.max_bytes = 3 * cache.lookup(f'{base_url}/0')['size']
+            for n in range(1, 6):
+                fetcher.fetch(f'{base_url}/{n}')
+    finally:
+        server.shutdown()
+    assert sum(meta['size'] for meta in cache._index.values()) == cache._total_bytes <= cache.max_bytes
+    assert cache.lookup(f'{base_url}/0') is None and cache.lookup(f'{base_url}/5') is not None
+    assert len(list(tmp_path.glob('*.gz'))) == len(cache._index)
+
+
+def test_analyzer_fetcher_revalidates_with_its_cache(tmp_path):
+    server, base_url = serve_articles(TEXTS, delay=0)
+    try:
+        TextAnalyzer(rules=local_rules(), cache_dir=str(tmp_path)).extract_article_info(f'{base_url}/1')
+        analyzer = TextAnalyzer(rules=local_rules(), cache_dir=str(tmp_path))
+        assert analyzer.extract_article_info(f'{base_url}/1') == ('Article 1', 'Article text 1.')
+    finally:
+        server.shutdown()
+    assert (analyzer.fetcher.cache.revalidated, analyzer.fetcher.cache.downloaded) == (1, 0)
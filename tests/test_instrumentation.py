@@ -0,0 +1,43 @@
+import json
+
+from support import local_rules, serve_articles
+from instrumentation import Histogram
+from pipeline import Pipeline
+from sentiment_analyzer import TextAnalyzer
+
+
+def test_histogram_percentiles_are_within_bucket_precision():
+    histogram = Histogram()
+    for ns in range(1, 10001):
+        histogram.record(ns * 1000)
+    for q, expected in ((50, 5_000_000), (95, 9_500_000), (99, 9_900_000)):
+        assert abs(histogram.percentile(q) - expected) / expected < 0.07
+    assert histogram.count == 10000 and histogram.max_ns == 10_000_000
+
+
+def test_pipeline_reports_stage_timings(tmp_path, monkeypatch, nltk_data):
+    monkeypatch.chdir(tmp_path)
+    texts = [f'Article {n} is a good read. It is short.' for n in range(5)]
+    server, base_url = serve_articles(texts, delay=0)
+    analyzer = TextAnalyzer(rules=local_rules())
+    pipeline = Pipeline(analyzer, cache_dir=None, result_cache_path=None, excel=True, timings_path='timings.json')
+    try:
+        pipeline.run([(n, f'{base_url}/{n}') for n in range(len(texts))])
+    finally:
+        server.shutdown()
+
+    stages = json.loads((tmp_path / 'timings.json').read_text())['stages']
+    for stage in ('fetch', 'parse', 'analysis', 'tokenization', 'syllables', 'write', 'flush', 'excel', 'run'):
+        assert stage in stages
+    assert stages['fetch']['calls'] == stages['page']['calls'] == 5
+    assert stages['run']['p50_ms'] <= stages['run']['max_ms']
+    assert 'analyze_text' not in vars(analyzer)  # The shared analyzer is unwrapped after the run.
+
+
+def test_disabled_timings_wrap_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    analyzer = TextAnalyzer()
+    pipeline = Pipeline(analyzer, cache_dir=None, result_cache_path=None)
+    with pipeline.instrumented():
+        assert not vars(analyzer).keys() & {'analyze_text', 'parse_article_html'}
+        assert 'fetch' not in vars(pipeline.open_fetcher())
@@ -0,0 +1,16 @@
+import pytest
+
+import main
+
+
+def test_main_checks_nltk_resources_before_scraping(monkeypatch):
+    monkeypatch.setattr('sentiment_analyzer.missing_nltk_resources', lambda: ['punkt'])
+
+    def scrape(*args, **kwargs):
+        raise AssertionError("Nothing should be fetched without the NLTK resources")
+
+    monkeypatch.setattr(main, 'ArticleScraper', scrape)
+    with pytest.raises(SystemExit) as exit_info:
+        main.main()
+    assert "Missing NLTK resources: punkt" in str(exit_info.value)
+    assert "python sentiment_analyzer.py setup" in str(exit_info.value)
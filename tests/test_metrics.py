@@ -0,0 +1,44 @@
+import pytest
+
+from support import load_corpus
+from document import METRICS, metric_name, plan_metrics
+from pipeline import ANALYSIS_SCHEMA
+from sentiment_analyzer import TextAnalyzer
+
+SENTIMENT = ['polarity-score', 'subjectivity_score']
+
+
+def test_plan_skips_the_stages_sentiment_does_not_need():
+    plan = plan_metrics(SENTIMENT)
+    assert plan.metrics == ('POLARITY SCORE', 'SUBJECTIVITY SCORE')
+    assert plan.counts == {'positive_score', 'negative_score'}
+    assert not plan.sentences
+
+    assert plan_metrics(['fog index']).sentences and 'complex_word_count' in plan_metrics(['fog index']).counts
+    assert plan_metrics().complete and plan_metrics().metrics == tuple(METRICS)
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError):
+        metric_name('sarcasm')
+
+
+@pytest.mark.parametrize('tokenizer', ['nltk', 'regex'])
+def test_selected_metrics_match_the_full_results(tokenizer, nltk_data):
+    texts = load_corpus()[:20]
+    full = [TextAnalyzer(tokenizer=tokenizer).analyze_text(text) for text in texts]
+    for name in METRICS:
+        analyzer = TextAnalyzer(tokenizer=tokenizer)
+        assert [analyzer.analyze_text(text, [name]) for text in texts] == [{name: row[name]} for row in full]
+
+    analyzer = TextAnalyzer(tokenizer=tokenizer)
+    expected = [{'POLARITY SCORE': row['POLARITY SCORE'], 'SUBJECTIVITY SCORE': row['SUBJECTIVITY SCORE']}
+                for row in full]
+    assert [analyzer.analyze_text(text, SENTIMENT) for text in texts] == expected
+    assert analyzer.analyze_batch(texts, SENTIMENT) == expected
+    assert analyzer.vocabulary._measured == 0  # No syllable was counted.
+
+
+def test_schema_keeps_only_the_selected_metric_columns():
+    columns = [column for column, _ in ANALYSIS_SCHEMA.with_metrics(plan_metrics(SENTIMENT).metrics).columns]
+    assert columns == ['POLARITY SCORE', 'SUBJECTIVITY SCORE', 'URL_ID', 'URL']
@@ -0,0 +1,35 @@
+import pytest
+
+from pipeline import OutputSchema, Pipeline
+from sentiment_analyzer import TextAnalyzer
+
+SCHEMAS = [OutputSchema('first.xlsx', [('URL_ID', 'URL_ID'), ('URL', 'URL')]),
+           OutputSchema('second.xlsx', [('URL_ID', 'URL_ID'), ('URL', 'URL')])]
+ROWS = [(url_id, f'https://example.com/{url_id}') for url_id in range(1, 7)]
+
+
+def records(rows):
+    return [{'URL_ID': url_id, 'URL': url} for url_id, url in rows]
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'jsonl', 'parquet'])
+def test_resume_after_crash_between_flushes_does_not_duplicate(tmp_path, monkeypatch, output_format):
+    if output_format == 'parquet':
+        pytest.importorskip('pyarrow')
+    monkeypatch.chdir(tmp_path)
+    pipeline = Pipeline(TextAnalyzer(), SCHEMAS, cache_dir=None, result_cache_path=None,
+                        output_format=output_format, batch_size=100)
+
+    first, second = pipeline.open_writers()
+    for record in records(ROWS[:4]):
+        pipeline.write(record, [first, second])
+    first.flush()  # The run dies here, before the second output is flushed.
+
+    writers = pipeline.open_writers(resume=True)
+    for record in records(pipeline.pending_rows(ROWS, writers)):
+        pipeline.write(record, writers)
+    for writer in writers:
+        writer.close()
+
+    for writer in writers:
+        assert [str(url_id) for url_id in writer.read()['URL_ID']] == [str(url_id) for url_id, _ in ROWS]
@@ -0,0 +1,73 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from support import local_rules, serve_articles
+from pipeline import Pipeline
+from sentiment_analyzer import TextAnalyzer
+
+
+class FailingAnalyzer(TextAnalyzer):
+
+    """Analyzer whose analysis fails on the articles containing 'boom'"""
+
+    def analyze_text(self, text, metrics=None):
+        if 'boom' in text:
+            raise ZeroDivisionError("boom")
+        return {'WORD COUNT': len(text.split())}
+
+
+@pytest.fixture
+def articles():
+    texts = ['boom'] + [f'article number {n}' for n in range(1, 100)]  # More pages than the queues hold.
+    server, base_url = serve_articles(texts, delay=0)
+    yield [(n, f'{base_url}/{n}') for n in range(len(texts))]
+    server.shutdown()
+
+
+def pipeline(tmp_path, monkeypatch, analyzer):
+    monkeypatch.chdir(tmp_path)
+    return Pipeline(analyzer, max_workers=4, cache_dir=None, result_cache_path=None, metrics=['WORD COUNT'])
+
+
+def test_run_async_raises_analysis_errors(tmp_path, monkeypatch, articles):
+    failing = pipeline(tmp_path, monkeypatch, FailingAnalyzer(rules=local_rules()))
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(asyncio.wait_for(failing.run_async(articles), timeout=20))
+
+
+def test_run_async_writes_records_in_input_order(tmp_path, monkeypatch, articles):
+    records = asyncio.run(pipeline(tmp_path, monkeypatch, FailingAnalyzer(rules=local_rules()))
+                          .records_async(articles[1:]))
+    assert [record['URL_ID'] for record in records] == list(range(1, 100))
+
+
+def test_run_attaches_its_analysis_cache_only_for_the_run(tmp_path, monkeypatch, articles, capsys):
+    analyzer = FailingAnalyzer(rules=local_rules())
+    cached = pipeline(tmp_path, monkeypatch, analyzer)
+    cached.result_cache_path = str(tmp_path / 'cache.sqlite')
+    cached.run(articles[1:10])
+    assert analyzer.result_cache is None  # Detached again...
+    with pytest.raises(sqlite3.ProgrammingError):
+        cached.result_cache.get('key')  # ...and closed.
+    assert 'Analysis cache' in capsys.readouterr().out
+
+    pipeline(tmp_path, monkeypatch, analyzer).run(articles[1:10])
+    assert 'Analysis cache' not in capsys.readouterr().out  # result_cache_path=None runs without a cache.
+
+
+def test_analysis_workers_give_the_in_process_records(tmp_path, monkeypatch, nltk_data):
+    texts = [f'Article {n} was a good and useful read. We liked it. It is number {n}.' for n in range(7)]
+    server, base_url = serve_articles(texts, delay=0)
+    rows = [(n, f'{base_url}/{n}') for n in range(len(texts))]
+    analyzer = TextAnalyzer(rules=local_rules(), tokenizer='regex')
+    try:
+        expected = list(pipeline(tmp_path, monkeypatch, analyzer).records(rows))
+        pooled = pipeline(tmp_path, monkeypatch, analyzer)
+        pooled.analysis_workers, pooled.batch_size = 2, 3
+        assert list(pooled.records(rows)) == expected
+        assert asyncio.run(pooled.records_async(rows)) == expected
+    finally:
+        server.shutdown()
+    assert [record['URL_ID'] for record in expected] == list(range(len(texts)))
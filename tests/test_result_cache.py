@@ -0,0 +1,27 @@
+from result_cache import AnalysisCache
+
+
+def test_eviction_keeps_the_most_recently_used_entries(tmp_path):
+    cache = AnalysisCache(str(tmp_path / 'cache.sqlite'), max_entries=10, commit_every=3)
+    for n in range(10):
+        cache.put(f'key{n}', {'n': n})
+    assert cache.get('key0') == {'n': 0}  # Used again, so no longer the oldest.
+    cache.put('key10', {'n': 10})  # Over max_entries: the least recently used entry goes.
+    assert cache.get('key1') is None
+    assert cache.get('key0') == {'n': 0} and cache.get('key10') == {'n': 10}
+    cache.close()
+
+
+def test_buffered_writes_survive_close(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = AnalysisCache(path, max_entries=3, commit_every=100)
+    for n in range(3):
+        cache.put(f'key{n}', {'n': n})
+    cache.get('key0')  # Its used_at is only buffered...
+    cache.close()  # ...until close writes it.
+
+    reopened = AnalysisCache(path, max_entries=3)
+    reopened.put('key3', {'n': 3})
+    assert reopened.get('key0') == {'n': 0} and reopened.get('key1') is None
+    assert reopened.get('key3') == {'n': 3}
+    reopened.close()
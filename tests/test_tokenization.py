@@ -0,0 +1,24 @@
+import pytest
+
+from support import load_corpus, metric_drift
+from sentiment_analyzer import TextAnalyzer
+from tokenization import TOKENIZERS, get_tokenizer
+
+# Largest mean relative drift per metric of the regex backend from NLTK over the corpus. Contractions and
+# abbreviations split differently, which moves counts by a few percent; a larger drift is a regression.
+REGEX_DRIFT_TOLERANCE = 0.06
+
+
+@pytest.mark.parametrize('name', sorted(TOKENIZERS))
+def test_backends_agree_on_plain_text(name, nltk_data):
+    tokenizer = get_tokenizer(name)
+    text = "The committee met on Monday. Its members voted 12 to 3! Was the outcome expected?"
+    assert tokenizer.clean_words(text) == ['the', 'committee', 'met', 'on', 'monday', 'its', 'members', 'voted',
+                                           '12', 'to', '3', 'was', 'the', 'outcome', 'expected']
+    assert len(tokenizer.sentences(text)) == 3
+
+
+def test_regex_metrics_drift_within_tolerance(nltk_data):
+    drift = metric_drift(TextAnalyzer(tokenizer='nltk'), TextAnalyzer(tokenizer='regex'), load_corpus())
+    too_far = {name: mean for name, (mean, _) in drift.items() if mean > REGEX_DRIFT_TOLERANCE}
+    assert not too_far, f"Mean drift above {REGEX_DRIFT_TOLERANCE:.0%}: {too_far}"
@@ -0,0 +1,89 @@
+import re
+
+from nltk.tokenize import word_tokenize, sent_tokenize
+
+# Runs of Unicode letters and digits, i.e. exactly the characters str.isalnum() accepts.
+WORD_PATTERN = re.compile(r'[^\W_]+')
+# Sentence ends: terminal punctuation followed by whitespace.
+SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?])\s+')
+# The same sentence ends, matched with their punctuation: cheaper to scan when only counting them.
+SENTENCE_BREAK_PATTERN = re.compile(r'[.!?]\s+')
+
+
+class NltkTokenizer:
+
+    """NLTK backend: Treebank word tokenization and punkt sentence splitting"""
+
+    name = 'nltk'
+
+    def words(self, text):
+        return word_tokenize(text)
+
+    def sentences(self, text):
+        return sent_tokenize(text)
+
+    def clean_words(self, text):
+
+        """Returns the lowercase alphanumeric tokens of the text"""
+
+        # Removing punctuations and converting to lowercase.
+        return [word.lower() for word in word_tokenize(text) if word.isalnum()]
+
+    def clean_sentence_words(self, sentence):
+
+        """Returns the lowercase alphanumeric tokens of one sentence, without segmenting it again"""
+
+        return [word.lower() for word in word_tokenize(sentence, preserve_line=True) if word.isalnum()]
+
+    def document_words(self, text):
+
+        """Returns the lowercase alphanumeric tokens of the text and its number of sentences"""
+
+        sentences = self.sentences(text)
+        return [word for sentence in sentences for word in self.clean_sentence_words(sentence)], len(sentences)
+
+
+class RegexTokenizer:
+
+    """Fast path backend: one compiled regex yields the lowercase alphanumeric tokens directly.
+
+    Contractions and abbreviations split differently from NLTK ("isn't" gives "isn" and "t", "U.S." gives
+    "u" and "s"), so the metrics drift slightly; benchmarks.py tokenizers measures by how much.
+    """
+
+    name = 'regex'
+
+    def words(self, text):
+        return WORD_PATTERN.findall(text)
+
+    def sentences(self, text):
+        return [sentence for sentence in SENTENCE_END_PATTERN.split(text.strip()) if sentence]
+
+    def clean_words(self, text):
+
+        """Returns the lowercase alphanumeric tokens of the text"""
+
+        return WORD_PATTERN.findall(text.lower())
+
+    clean_sentence_words = clean_words
+
+    def document_words(self, text):
+
+        """Returns the lowercase alphanumeric tokens of the text and its number of sentences"""
+
+        # Sentences end at whitespace, so tokenizing the whole text gives the same tokens as sentence by sentence,
+        # and counting the sentence ends avoids building the sentence strings.
+        stripped = text.strip()
+        return self.clean_words(text), (len(SENTENCE_BREAK_PATTERN.findall(stripped)) + 1 if stripped else 0)
+
+
+TOKENIZERS = {tokenizer.name: tokenizer for tokenizer in (NltkTokenizer, RegexTokenizer)}
+
+
+def get_tokenizer(name):
+
+    """Returns a tokenizer backend by name"""
+
+    if name not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer {name}, expected one of {', '.join(sorted(TOKENIZERS))}")
+    return TOKENIZERS[name]()
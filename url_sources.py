@@ -0,0 +1,74 @@
+import csv
+import json
+import os
+
+
+def _rows_from_records(records):
+
+    """Turns header-keyed records into (URL_ID, URL) tuples, numbering the rows when there is no URL_ID"""
+
+    for number, record in enumerate(records, start=1):
+        url = record.get('URL')
+        if url:
+            yield record.get('URL_ID', number), url
+
+
+def read_excel_urls(path):
+
+    """Yields (URL_ID, URL) rows of an Excel sheet, reading it row by row in read-only mode"""
+
+    from openpyxl import load_workbook  # Only needed for Excel inputs.
+
+    workbook = load_workbook(path, read_only=True)  # Streams the sheet instead of loading it whole.
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else None for cell in next(rows, ())]
+        yield from _rows_from_records(dict(zip(header, row)) for row in rows)
+    finally:
+        workbook.close()
+
+
+def read_csv_urls(path):
+
+    """Yields (URL_ID, URL) rows of a CSV file with a header row"""
+
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from _rows_from_records(csv.DictReader(f))
+
+
+def read_jsonl_urls(path):
+
+    """Yields (URL_ID, URL) rows of a JSON Lines file, one {"URL_ID": ..., "URL": ...} object per line"""
+
+    with open(path, encoding='utf-8') as f:
+        yield from _rows_from_records(json.loads(line) for line in f if line.strip())
+
+
+def read_text_urls(path):
+
+    """Yields (line number, URL) rows of a plain text file with one URL per line"""
+
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            url = line.strip()
+            if url and not url.startswith('#'):
+                yield number, url
+
+
+URL_READERS = {
+    '.xlsx': read_excel_urls,
+    '.xlsm': read_excel_urls,
+    '.csv': read_csv_urls,
+    '.jsonl': read_jsonl_urls,
+    '.txt': read_text_urls,
+}
+
+
+def read_urls(path):
+
+    """Lazily yields lightweight (URL_ID, URL) tuples from an input file, picking the reader by extension"""
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in URL_READERS:
+        raise ValueError(f"Unsupported input file {path}, expected one of {', '.join(sorted(URL_READERS))}")
+    return URL_READERS[extension](path)
@@ -0,0 +1,178 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from document import AnalyzedDocument, plan_metrics
+
+
+class Vocabulary:
+
+    """Interns tokens to integer ids, with the properties of every id precomputed in compact NumPy arrays.
+
+    Each distinct token is hashed and measured once, when it is first seen. Scoring an article is then
+    a gather over its int32 token id array instead of per-word Python work. Syllables are only counted
+    when a syllable based property is first read, so sentiment-only runs never count them.
+    """
+
+    PROPERTIES = {
+        'is_positive': np.bool_,
+        'is_negative': np.bool_,
+        'is_pronoun': np.bool_,
+        'is_stopword': np.bool_,
+        'is_word': np.bool_,  # Kept by cleaning: alphanumeric and not a stopword.
+        'syllables': np.int32,
+        'length': np.int32,
+        'is_complex': np.bool_,
+    }
+    # Properties filled in lazily, for the ids interned since they were last read.
+    SYLLABLE_PROPERTIES = ('syllables', 'is_complex')
+
+    def __init__(self, analyzer, capacity=1024):
+        self.analyzer = analyzer
+        self.ids = {}  # Token -> id.
+        self.words = []  # Id -> token.
+        self._arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.PROPERTIES.items()}
+        self._measured = 0  # Number of ids whose syllable properties are filled in.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getattr__(self, name):
+
+        """Returns the array of a per-id property, e.g. vocabulary.syllables"""
+
+        if name in Vocabulary.SYLLABLE_PROPERTIES and self._measured < len(self.ids):
+            self._measure_syllables()
+        if name in Vocabulary.PROPERTIES:
+            return self._arrays[name][:len(self.ids)]
+        raise AttributeError(name)
+
+    def _add(self, token):
+        with self._lock:
+            if token in self.ids:
+                return self.ids[token]
+            token_id = len(self.ids)
+            if token_id == len(self._arrays['length']):  # Doubles the arrays when full.
+                self._arrays = {name: np.concatenate([array, np.zeros_like(array)])
+                                for name, array in self._arrays.items()}
+
+            analyzer = self.analyzer
+            is_stopword = token in analyzer.stop_words
+            is_word = token.isalnum() and not is_stopword
+            values = {
+                'is_positive': token in analyzer.lexicon.positive,
+                'is_negative': token in analyzer.lexicon.negative,
+                'is_pronoun': token in analyzer.personal_pronouns,
+                'is_stopword': is_stopword,
+                'is_word': is_word,
+                'length': len(token) if is_word else 0,
+            }
+            for name, value in values.items():
+                self._arrays[name][token_id] = value
+            self.words.append(token)
+            self.ids[token] = token_id
+            return token_id
+
+    def _measure_syllables(self):
+
+        """Counts the syllables of the words interned since the last call"""
+
+        with self._lock:
+            arrays = self._arrays
+            count_syllables = self.analyzer.count_syllables
+            for token_id in range(self._measured, len(self.ids)):
+                if arrays['is_word'][token_id]:
+                    syllables = count_syllables(self.words[token_id])
+                    arrays['syllables'][token_id] = syllables
+                    arrays['is_complex'][token_id] = arrays['length'][token_id] > 6 and syllables > 3
+            self._measured = len(self.ids)
+
+    def encode(self, tokens):
+
+        """Returns the int32 id array of the tokens, interning the new ones"""
+
+        ids = self.ids
+        return np.fromiter((ids[token] if token in ids else self._add(token) for token in tokens),
+                           dtype=np.int32, count=len(tokens))
+
+    # Token counts of a document: name -> (property array, whether to sum it rather than count its hits).
+    COUNTS = {
+        'positive_score': ('is_positive', False),
+        'negative_score': ('is_negative', False),
+        'personal_pronouns': ('is_pronoun', False),
+        'word_count': ('is_word', False),
+        'total_syllables': ('syllables', True),
+        'total_characters': ('length', True),
+        'complex_word_count': ('is_complex', False),
+    }
+
+    def counts(self, token_ids, names=None):
+
+        """Returns the requested token counts (all by default), as gathers over the token id array"""
+
+        counts = {}
+        for name in names or self.COUNTS:
+            prop, summed = self.COUNTS[name]
+            values = getattr(self, prop)[token_ids]
+            counts[name] = int(values.sum() if summed else np.count_nonzero(values))
+        return counts
+
+
+def score_batch(analyzer, texts, metrics=None):
+
+    """Scores a batch of texts like TextAnalyzer.analyze_text, with NumPy reductions instead of per-token loops.
+
+    Each article is tokenized in one call that only counts its sentences, and the tokens of the whole batch
+    are interned at once: pandas factorizes them in C, so only the distinct tokens are looked up in the
+    vocabulary, and stopwords are dropped with its is_stopword mask. The ids go into a sparse document-term
+    count matrix (kept in coordinate form); positive/negative/pronoun counts are matrix-vector products with
+    the vocabulary's indicator vectors, and the syllable, length and complex-word statistics are products
+    with its per-id arrays. Only the counts the requested metrics need are computed.
+    """
+
+    plan = plan_metrics(metrics)
+    vocabulary = analyzer.vocabulary
+    tokenizer = analyzer.tokenizer
+    words = []
+    word_counts = []
+    sentence_counts = []
+    for text in texts:
+        if plan.sentences:
+            document_words, sentence_count = tokenizer.document_words(text)
+        else:
+            document_words, sentence_count = tokenizer.clean_words(text), None
+        words.extend(document_words)
+        word_counts.append(len(document_words))
+        sentence_counts.append(sentence_count)
+
+    n_docs = len(word_counts)
+    if n_docs == 0:
+        return []
+
+    codes, distinct = pd.factorize(np.array(words, dtype=object))
+    term_ids = vocabulary.encode(list(distinct))[codes]
+    doc_ids = np.repeat(np.arange(n_docs, dtype=np.int64), word_counts)
+    kept = ~vocabulary.is_stopword[term_ids]  # Removing the stopwords!
+    term_ids = term_ids[kept]
+    doc_ids = doc_ids[kept]
+    token_counts = np.bincount(doc_ids, minlength=n_docs)
+    n_terms = max(len(vocabulary), 1)
+
+    # Document-term counts: the distinct (doc, term) cells with the number of occurrences in each.
+    cells, counts = np.unique(doc_ids * n_terms + term_ids, return_counts=True)
+    rows, columns = np.divmod(cells, n_terms)
+
+    def per_document(vector):  # The matrix-vector product X @ vector.
+        return np.bincount(rows, weights=counts * vector[columns], minlength=n_docs).astype(np.int64)
+
+    totals = {name: per_document(getattr(vocabulary, prop)) for name, (prop, _) in vocabulary.COUNTS.items()
+              if name in plan.counts}
+
+    results = []
+    for doc, token_ids in enumerate(np.split(term_ids, np.cumsum(token_counts)[:-1])):
+        counts = {name: int(values[doc]) for name, values in totals.items()}
+        document = AnalyzedDocument(token_ids, None, vocabulary, counts, sentence_count=sentence_counts[doc])
+        results.append(document.to_dict(plan.metrics))
+    return results